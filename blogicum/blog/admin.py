@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Location, Category, Post
+from .models import Location, Category, ImageJob, Post
 
 admin.site.register(Location)
 
@@ -15,6 +15,8 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'location',
         'author',
+        'comment_count',
+        'is_live',
     )
     empty_value_display = 'Не задано'
 
@@ -33,3 +35,11 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Category, CategoryAdmin)
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image_name', 'post', 'status', 'attempts', 'run_after')
+    list_filter = ('status',)
+
+
+admin.site.register(ImageJob, ImageJobAdmin)
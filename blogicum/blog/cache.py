@@ -0,0 +1,244 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from blog.models import Category, Post
+from core import metrics as request_metrics
+
+VERSION_KEY = 'blog:version:{kind}:{pk}'
+COUNTER_KEY = 'blog:counter:{name}'
+PAGE_KEY = 'blog:page:{version}:{path}'
+PAGES = ('pages', 0)
+LISTING_COUNT_KEY = 'blog:count:{listing}'
+FEED_STAMP_KEY = 'blog:feed:{listing}'
+
+# slug -> (категория, её версия); живёт в памяти процесса
+_categories = {}
+
+
+def new_stamp():
+    return time.time_ns()
+
+
+def get_versions(objects):
+    """
+    Версии объектов вида (kind, pk) одним запросом к кешу.
+
+    Отсутствующей версии присваивается свежая метка времени, поэтому
+    вытесненная из кеша версия никогда не совпадёт со старой.
+    """
+    keys = {
+        VERSION_KEY.format(kind=kind, pk=pk): (kind, pk)
+        for kind, pk in objects
+    }
+    found = cache.get_many(keys)
+    missing = {key: new_stamp() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: value for key, value in found.items()}
+
+
+def bump_version(kind, pk):
+    """Сбросить все фрагменты, зависящие от объекта."""
+    cache.set(VERSION_KEY.format(kind=kind, pk=pk), new_stamp(), None)
+
+
+def count(name, delta=1):
+    if not delta:
+        return
+    request_metrics.count(name, delta)
+    key = COUNTER_KEY.format(name=name)
+    if not cache.add(key, delta, None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, None)
+
+
+def get_counter(name):
+    return cache.get(COUNTER_KEY.format(name=name), 0)
+
+
+def page_cache_key(request, params=()):
+    """
+    Ключ страницы: общая версия страниц, путь и параметры params.
+
+    Остальные параметры строки запроса страницу не меняют и в ключ не
+    входят, иначе ?x=<случайное> заводило бы запись на каждый запрос.
+    """
+    version = get_versions((PAGES,))[PAGES]
+    query = urlencode(sorted(
+        (name, value)
+        for name in params for value in request.GET.getlist(name)
+    ))
+    path = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return PAGE_KEY.format(version=version, path=path)
+
+
+def invalidate_pages():
+    bump_version(*PAGES)
+
+
+def get_published_category(slug):
+    """
+    Опубликованная категория по slug или 404.
+
+    Категория хранится в памяти процесса и проверяется по версии из общего
+    кеша, которую сбрасывает сохранение категории (в том числе в админке).
+    """
+    entry = _categories.get(slug)
+    if entry is not None:
+        category, version = entry
+        key = ('category', category.pk)
+        if get_versions((key,))[key] == version:
+            return category
+    category = get_object_or_404(Category, slug=slug, is_published=True)
+    key = ('category', category.pk)
+    _categories[slug] = (category, get_versions((key,))[key])
+    return category
+
+
+def forget_categories():
+    _categories.clear()
+
+
+def get_listing_count(listing, queryset):
+    """
+    Число публикаций в списке (лента, категория, автор) из кеша.
+
+    Небольшие списки пересчитываются точно после истечения таймаута.
+    Если в списке больше BLOG_EXACT_COUNT_THRESHOLD публикаций, он
+    считается точно раз в BLOG_LARGE_LISTING_COUNT_TIMEOUT, а в
+    промежутке счётчик только сдвигается при записи постов (атомарно,
+    см. core.cache) и служит оценкой.
+    """
+    key = LISTING_COUNT_KEY.format(listing=listing)
+    value = cache.get(key)
+    if value is not None:
+        return value
+    threshold = settings.BLOG_EXACT_COUNT_THRESHOLD
+    value = queryset.order_by()[:threshold + 1].count()
+    if value > threshold:
+        value = queryset.order_by().count()
+        cache.set(key, value, settings.BLOG_LARGE_LISTING_COUNT_TIMEOUT)
+    else:
+        cache.set(key, value, settings.BLOG_LISTING_COUNT_TIMEOUT)
+    return value
+
+
+POST_STATE_FIELDS = (
+    'author_id', 'category_id', 'is_published', 'is_live',
+    'category__is_published',
+)
+
+
+def post_state(post_id, *fields):
+    """Поля поста, от которых зависит его место в списках, и fields."""
+    return Post.only_author_objects.filter(pk=post_id).values(
+        *POST_STATE_FIELDS, *fields
+    ).first()
+
+
+def state_listings(state):
+    """Списки, в которых показывается пост с состоянием state."""
+    if state is None:
+        return set()
+    author_id = state['author_id']
+    listings = {f'author:{author_id}:own'}
+    if (
+        state['is_published'] and state['is_live']
+        and state['category__is_published']
+    ):
+        listings |= {
+            'feed',
+            f'category:{state["category_id"]}',
+            f'author:{author_id}:public',
+        }
+    return listings
+
+
+def post_listings(post_id):
+    """Списки, в которых сейчас показывается пост."""
+    return state_listings(post_state(post_id))
+
+
+def instance_listings(post, old_state=None):
+    """
+    Списки только что сохранённого поста без повторного запроса.
+
+    Публикация категории берётся из состояния до сохранения old_state,
+    пока категория та же: загруженная с постом категория могла устареть.
+    """
+    if old_state is not None and (
+        old_state['category_id'] == post.category_id
+    ):
+        category_published = old_state['category__is_published']
+    else:
+        category_published = (
+            post.category_id is not None and post.category.is_published
+        )
+    return state_listings({
+        'author_id': post.author_id,
+        'category_id': post.category_id,
+        'is_published': post.is_published,
+        'is_live': post.is_live,
+        'category__is_published': category_published,
+    })
+
+
+def adjust_listing_counts(listings, delta):
+    for listing in listings:
+        try:
+            cache.incr(LISTING_COUNT_KEY.format(listing=listing), delta)
+        except ValueError:
+            # Счётчика нет в кеше: он будет посчитан при обращении
+            pass
+
+
+def forget_listing_counts(listings):
+    cache.delete_many([
+        LISTING_COUNT_KEY.format(listing=listing) for listing in listings
+    ])
+
+
+def get_feed_stamp(listing, queryset):
+    """
+    (ETag, дата новейшей публикации) ленты для условного GET.
+
+    ETag выводится из состояния ленты: даты новейшей публикации и версии
+    списка, которую сигналы сдвигают при записи постов. Пока лента не
+    менялась, пересчёт после BLOG_FEED_STAMP_TIMEOUT даёт тот же ETag и
+    стоит одного запроса, а в промежутке опрос не обращается к базе.
+    Записи в обход сигналов (update(), загрузка дампа), сдвинувшие дату
+    новейшей публикации, видны не позже чем через этот таймаут.
+    """
+    key = FEED_STAMP_KEY.format(listing=listing)
+    value = cache.get(key)
+    if value is None:
+        newest = queryset.order_by('-pub_date').values_list(
+            'pub_date', flat=True
+        ).first()
+        version_key = ('feed', listing)
+        version = get_versions((version_key,))[version_key]
+        etag = hashlib.md5(
+            f'{listing}:{newest}:{version}'.encode()
+        ).hexdigest()
+        value = (etag, newest)
+        cache.set(key, value, settings.BLOG_FEED_STAMP_TIMEOUT)
+    return value
+
+
+def forget_feed_stamps(listings):
+    """Сдвинуть версии списков: их лентам нужен новый ETag."""
+    cache.delete_many([
+        FEED_STAMP_KEY.format(listing=listing) for listing in listings
+    ])
+    cache.set_many({
+        VERSION_KEY.format(kind='feed', pk=listing): new_stamp()
+        for listing in listings
+    }, None)
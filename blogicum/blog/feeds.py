@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+
+class StreamingFeedMixin:
+    """
+    Лента, которая отдаётся по частям: шапка, по элементу на пост и
+    закрывающие теги. Элементы не копятся в self.items, поэтому память
+    не зависит от длины ленты.
+    """
+
+    closing_tags = None
+    last_modified = None
+
+    def latest_post_date(self):
+        return self.last_modified or super().latest_post_date()
+
+    def render_item(self, item):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        self.items = []
+        self.add_item(**item)
+        self.write_items(handler)
+        self.items = []
+        return buffer.getvalue()
+
+    def stream(self, items):
+        """Куски документа; items — словари аргументов add_item()."""
+        buffer = StringIO()
+        self.items = []
+        self.write(buffer, 'utf-8')
+        document = buffer.getvalue()
+        split = document.rindex(self.closing_tags)
+        yield document[:split]
+        for item in items:
+            yield self.render_item(item)
+        yield document[split:]
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    closing_tags = '</channel></rss>'
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    closing_tags = '</feed>'
+
+
+FORMATS = {
+    'rss': RssFeed,
+    'atom': AtomFeed,
+}
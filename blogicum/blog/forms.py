@@ -1,17 +1,93 @@
+import logging
+import time
+
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, UnidentifiedImageError
 
 from .models import Post, Comment
 
+logger = logging.getLogger('blog.uploads')
+
+
+class HeaderCheckedImageField(forms.ImageField):
+    """
+    Проверяет изображение по заголовку: формат и размеры читаются без
+    декодирования всего растра, файл не копируется в память.
+    """
+
+    default_error_messages = {
+        'too_many_pixels': 'Изображение слишком большое: не больше '
+                           '%(limit)s мегапикселей.',
+        'too_large': 'Файл слишком большой: не больше %(limit)s.',
+    }
+
+    def to_python(self, data):
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        started = time.perf_counter()
+        if hasattr(data, 'temporary_file_path'):
+            source = data.temporary_file_path()
+        else:
+            source = data
+            source.seek(0)
+        try:
+            image = Image.open(source)
+            width, height = image.size
+        except (
+            UnidentifiedImageError, OSError, Image.DecompressionBombError
+        ) as error:
+            raise ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image',
+            ) from error
+        if width * height > settings.BLOG_MAX_IMAGE_PIXELS:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': settings.BLOG_MAX_IMAGE_PIXELS // 10 ** 6},
+            )
+        logger.info(
+            'Заголовок %s: %s %sx%s, %s байт, %.2f мс',
+            f.name, image.format, width, height, f.size,
+            (time.perf_counter() - started) * 1000,
+        )
+        f.image = image
+        f.content_type = Image.MIME.get(image.format)
+        if hasattr(f, 'seek') and callable(f.seek):
+            f.seek(0)
+        return f
+
 
 class PostForm(forms.ModelForm):
 
+    def __init__(self, *args, rejected_uploads=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rejected_uploads = rejected_uploads
+
     class Meta:
         model = Post
         fields = ('title', 'text', 'pub_date', 'location', 'category', 'image')
+        field_classes = {'image': HeaderCheckedImageField}
         '''widgets = {
       'post_id':,
     }'''
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'image' in self.rejected_uploads:
+            field = self.fields['image']
+            self.add_error('image', ValidationError(
+                field.error_messages['too_large'],
+                code='too_large',
+                params={
+                    'limit': filesizeformat(settings.BLOG_MAX_IMAGE_SIZE)
+                },
+            ))
+        return cleaned_data
+
 
 class CommentForm(forms.ModelForm):
 
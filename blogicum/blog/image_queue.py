@@ -0,0 +1,109 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from blog.cache import bump_version, invalidate_pages
+from blog.images import variants_exist
+from blog.models import ImageJob, Post
+
+
+def enqueue(post):
+    """
+    Поставить изображение поста в очередь на подготовку копий.
+
+    Хранилище складывает одинаковые загрузки в один файл: если копии
+    этого файла уже готовы, пост сразу отмечается готовым.
+    """
+    name = post.image.name
+    if variants_exist(name) and not ImageJob.objects.filter(
+        image_name=name, status=ImageJob.Status.RUNNING
+    ).exists():
+        ImageJob.objects.filter(post=post).delete()
+        mark_ready(name)
+        return
+    job = {
+        'image_name': name,
+        'status': ImageJob.Status.PENDING,
+        'attempts': 0,
+        'run_after': timezone.now(),
+        'last_error': '',
+    }
+    # UPDATE и INSERT вместо update_or_create: без SELECT и точек
+    # сохранения на каждую загрузку
+    if not ImageJob.objects.filter(post=post).update(**job):
+        ImageJob.objects.create(post=post, **job)
+
+
+def reset_running():
+    """Вернуть в очередь задания, брошенные упавшим обработчиком."""
+    return ImageJob.objects.filter(status=ImageJob.Status.RUNNING).update(
+        status=ImageJob.Status.PENDING
+    )
+
+
+def claim(limit):
+    """
+    Забрать до limit готовых к запуску заданий; безопасно для нескольких
+    обработчиков — задание достаётся тому, чей UPDATE его изменил.
+
+    Один файл может стоять в очереди от нескольких постов. Задание не
+    забирается, пока его файл обрабатывается по другому заданию: копии
+    одного файла готовит только один обработчик.
+    """
+    candidates = ImageJob.objects.filter(
+        status=ImageJob.Status.PENDING, run_after__lte=timezone.now(),
+    ).order_by('run_after').values_list('pk', flat=True)[:limit]
+    running = ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING
+    ).values('image_name')
+    claimed = [
+        pk for pk in candidates
+        if ImageJob.objects.filter(
+            pk=pk, status=ImageJob.Status.PENDING
+        ).exclude(image_name__in=running).update(
+            status=ImageJob.Status.RUNNING
+        )
+    ]
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+def mark_ready(image_name):
+    """Отметить готовыми все посты с этим файлом."""
+    post_ids = list(Post.only_author_objects.filter(
+        image=image_name, image_variants_at__isnull=True
+    ).values_list('pk', flat=True))
+    if not post_ids:
+        return
+    Post.only_author_objects.filter(pk__in=post_ids).update(
+        image_variants_at=timezone.now()
+    )
+    for post_id in post_ids:
+        bump_version('post', post_id)
+    invalidate_pages()
+
+
+def complete(job):
+    mark_ready(job.image_name)
+    # Копии готовы для всех постов с этим файлом. Если за время обработки
+    # пост получил новое изображение, его задание уже переписано на другой
+    # файл и остаётся в очереди
+    ImageJob.objects.filter(image_name=job.image_name).delete()
+
+
+def fail(job, error):
+    attempts = job.attempts + 1
+    if attempts >= settings.BLOG_IMAGE_JOB_MAX_ATTEMPTS:
+        status, run_after = ImageJob.Status.FAILED, job.run_after
+    else:
+        status = ImageJob.Status.PENDING
+        run_after = timezone.now() + datetime.timedelta(
+            seconds=settings.BLOG_IMAGE_JOB_RETRY_DELAY * 2 ** (attempts - 1)
+        )
+    ImageJob.objects.filter(
+        pk=job.pk, image_name=job.image_name,
+        status=ImageJob.Status.RUNNING,
+    ).update(
+        status=status, attempts=attempts, run_after=run_after,
+        last_error=str(error),
+    )
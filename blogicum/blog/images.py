@@ -0,0 +1,73 @@
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Расширение файла -> (формат Pillow, параметры сохранения)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(image_name, width, ext):
+    """posts_images/photo.png -> posts_images/variants/photo_png_640.webp"""
+    directory, filename = posixpath.split(image_name)
+    root = filename.replace('.', '_')
+    return posixpath.join(directory, 'variants', f'{root}_{width}.{ext}')
+
+
+def variant_names(image_name):
+    return [
+        variant_name(image_name, width, ext)
+        for width in settings.BLOG_IMAGE_WIDTHS
+        for ext in FORMATS
+    ]
+
+
+def variants_exist(image_name, storage=default_storage):
+    return all(storage.exists(name) for name in variant_names(image_name))
+
+
+def srcset(image_name, ext, storage=default_storage):
+    return ', '.join(
+        f'{storage.url(variant_name(image_name, width, ext))} {width}w'
+        for width in settings.BLOG_IMAGE_WIDTHS
+    )
+
+
+def encode(image, ext):
+    image_format, options = FORMATS[ext]
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(image_name, storage=default_storage):
+    """
+    Сохранить уменьшенные копии изображения во всех ширинах и форматах.
+
+    Копии не бывают больше оригинала. Возвращает имена созданных файлов.
+    """
+    with storage.open(image_name) as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    created = []
+    for width in settings.BLOG_IMAGE_WIDTHS:
+        resized = original.copy()
+        resized.thumbnail((width, width * 4), Image.LANCZOS)
+        for ext in FORMATS:
+            name = variant_name(image_name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            created.append(
+                storage.save(name, ContentFile(encode(resized, ext)))
+            )
+    return created
@@ -0,0 +1,53 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import Context, Template
+from django.template.loader import get_template
+
+# Прежняя разметка: ссылка на каждую страницу из page_range
+FULL_RANGE_TEMPLATE = Template(
+    '{% for i in page_obj.paginator.page_range %}'
+    '<li class="page-item"><a class="page-link" href="?page={{ i }}">'
+    '{{ i }}</a></li>{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендера includes/paginator.html и полного '
+        'page_range для разного числа страниц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+',
+            default=[1_000, 10_000, 100_000, 1_000_000],
+            help='Число объектов в списке.',
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        template = get_template('includes/paginator.html')
+        repeat = options['repeat']
+        self.stdout.write(
+            f'{"объектов":>10} {"страниц":>8} {"окно, мс":>10} '
+            f'{"байт":>6} {"полный, мс":>11} {"байт":>9}'
+        )
+        for size in options['sizes']:
+            paginator = Paginator(range(size), 10)
+            page_obj = paginator.page(paginator.num_pages // 2)
+            context = {'page_obj': page_obj}
+            window = template.render(context)
+            full = FULL_RANGE_TEMPLATE.render(Context(context))
+            window_ms = timeit.timeit(
+                lambda: template.render(context), number=repeat
+            ) / repeat * 1000
+            full_ms = timeit.timeit(
+                lambda: FULL_RANGE_TEMPLATE.render(Context(context)),
+                number=max(repeat // 10, 1),
+            ) / max(repeat // 10, 1) * 1000
+            self.stdout.write(
+                f'{size:>10} {paginator.num_pages:>8} {window_ms:>10.3f} '
+                f'{len(window):>6} {full_ms:>11.3f} {len(full):>9}'
+            )
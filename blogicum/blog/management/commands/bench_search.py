@@ -0,0 +1,138 @@
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import SearchPaginator
+from blog.search import search_posts
+
+BATCH = 10_000
+INSERT_POST = (
+    'INSERT INTO blog_post (is_published, is_live, created_at, title, '
+    'text, pub_date, author_id, category_id, comment_count, image) '
+    "VALUES (1, 1, %s, %s, %s, %s, 1, 1, 0, '')"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет временную базу синтетическими публикациями и измеряет '
+        'поиск: первые 10 результатов по BM25, следующую страницу по '
+        'курсору и для сравнения поиск подстроки через LIKE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--vocabulary', type=int, default=50_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        # Суффикс, чтобы слова не были префиксами друг друга:
+        # последнее слово запроса ищется по префиксу
+        self.words = [
+            f'слово{index}я' for index in range(options['vocabulary'])
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            alias = 'bench_search'
+            connections.settings[alias] = {
+                'ENGINE': 'core.db',
+                'NAME': Path(directory) / 'search.sqlite3',
+            }
+            connections.ensure_defaults(alias)
+            connections.prepare_test_settings(alias)
+            try:
+                with override_settings(DATABASE_ROUTERS=[]):
+                    call_command('migrate', database=alias, verbosity=0)
+                    self.fill(alias, options['posts'])
+                    self.measure(alias, options['queries'])
+            finally:
+                connections[alias].close()
+
+    def word(self):
+        """Слово по закону Ципфа: номер распределён лог-равномерно."""
+        return self.words[
+            int(len(self.words) ** self.random.random()) - 1
+        ]
+
+    def sentence(self, size):
+        return ' '.join(self.word() for _ in range(size))
+
+    def fill(self, alias, total):
+        start = time.perf_counter()
+        now = timezone.now()
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO auth_user (password, is_superuser, username, "
+                "first_name, last_name, email, is_staff, is_active, "
+                "date_joined) VALUES ('', 0, 'bench', '', '', '', 0, 1, %s)",
+                [now],
+            )
+            cursor.execute(
+                "INSERT INTO blog_category (is_published, title, slug, "
+                "description, created_at) "
+                "VALUES (1, 'Поиск', 'search', '', %s)",
+                [now],
+            )
+            for offset in range(0, total, BATCH):
+                cursor.executemany(INSERT_POST, [
+                    (
+                        now, self.sentence(6), self.sentence(60),
+                        now - timedelta(minutes=offset + index + 1),
+                    )
+                    for index in range(min(BATCH, total - offset))
+                ])
+        self.stdout.write(
+            f'Вставлено публикаций: {total} за '
+            f'{time.perf_counter() - start:.1f} с'
+        )
+
+    def timed(self, queries, run):
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        return (
+            statistics.median(times) * 1000,
+            times[int(len(times) * 0.95)] * 1000,
+        )
+
+    def measure(self, alias, count):
+        posts = Post.objects.using(alias)
+        # Запросы из того же распределения: частые и редкие слова
+        queries = [self.word() for _ in range(count)]
+
+        def first_page(query):
+            paginator = SearchPaginator(search_posts(posts, query), 10)
+            return paginator.page()
+
+        def next_page(query):
+            page = first_page(query)
+            if page.next_cursor:
+                page.paginator.page(after=page.next_cursor)
+
+        def like(query):
+            list(posts.filter(text__icontains=query).order_by(
+                '-pub_date'
+            )[:10])
+
+        self.stdout.write(f'{"запрос":<22} {"медиана, мс":>12} {"p95, мс":>9}')
+        for name, run in (
+            ('BM25, первая страница', first_page),
+            ('BM25, две страницы', next_page),
+            ('LIKE %слово%', like),
+        ):
+            median, p95 = self.timed(queries, run)
+            self.stdout.write(f'{name:<22} {median:>12.1f} {p95:>9.1f}')
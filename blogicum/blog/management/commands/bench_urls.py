@@ -0,0 +1,43 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from blog.urlbuilder import build_url
+
+CASES = (
+    ('blog:index', {}),
+    ('blog:post_detail', {'pk': 12345}),
+    ('blog:profile', {'username': 'leo.tolstoy'}),
+    ('blog:category_posts', {'category_slug': 'travel'}),
+    ('blog:edit_comment', {'pk': 12345, 'comment_id': 678}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость reverse() и build_url() для адресов блога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        number = options['number']
+        self.stdout.write(
+            f'{"адрес":<22} {"reverse, мкс":>13} {"build_url, мкс":>15} '
+            f'{"ускорение":>10}'
+        )
+        for viewname, kwargs in CASES:
+            expected = reverse(viewname, kwargs=kwargs)
+            if build_url(viewname, **kwargs) != expected:
+                self.stderr.write(f'{viewname}: адреса не совпадают')
+                continue
+            reverse_us = timeit.timeit(
+                lambda: reverse(viewname, kwargs=kwargs), number=number
+            ) / number * 10 ** 6
+            build_us = timeit.timeit(
+                lambda: build_url(viewname, **kwargs), number=number
+            ) / number * 10 ** 6
+            self.stdout.write(
+                f'{viewname:<22} {reverse_us:>13.2f} {build_us:>15.2f} '
+                f'{reverse_us / build_us:>9.1f}x'
+            )
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog import image_queue
+from blog.images import generate_variants, variants_exist
+from blog.models import ImageJob, Post
+
+
+def process(image_name):
+    return image_name, generate_variants(image_name)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии уже загруженных изображений публикаций '
+        'в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов (по умолчанию — по числу ядер).',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии, даже если они уже есть.',
+        )
+
+    def mark_ready(self, names):
+        # Как и обработчик очереди: сбросить карточки и страницы, иначе
+        # они сутки показывали бы исходный файл вместо копий
+        for name in names:
+            image_queue.mark_ready(name)
+        ImageJob.objects.filter(image_name__in=names).delete()
+
+    def handle(self, *args, **options):
+        names = set(
+            Post.only_author_objects.exclude(image='').values_list(
+                'image', flat=True
+            )
+        )
+        if not options['force']:
+            ready = {name for name in names if variants_exist(name)}
+            self.mark_ready(ready)
+            names -= ready
+        self.stdout.write(f'Изображений к обработке: {len(names)}')
+        failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=django.setup
+        ) as executor:
+            futures = {
+                executor.submit(process, name): name for name in names
+            }
+            for future in as_completed(futures):
+                try:
+                    name, created = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{futures[future]}: {error}')
+                else:
+                    self.mark_ready({name})
+                    self.stdout.write(f'{name}: {len(created)} копий')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, ошибок: {failed}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import get_counter
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кеша карточек и страниц.'
+
+    def handle(self, *args, **options):
+        for title, name in (
+            ('Карточки публикаций', 'post_card'),
+            ('Страницы для анонимов', 'page'),
+        ):
+            hits = get_counter(f'{name}_hits')
+            misses = get_counter(f'{name}_misses')
+            total = hits + misses
+            ratio = hits / total * 100 if total else 0
+            self.stdout.write(
+                f'{title}: попаданий {hits}, промахов {misses}, '
+                f'доля попаданий {ratio:.1f}%'
+            )
@@ -0,0 +1,96 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory
+
+from blog.models import Category, Comment, Post
+from blog.views import (
+    CategoryPostsListView, PostListView, UserPageListView
+)
+from users.forms import User
+
+HOT_TABLES = (Post._meta.db_table, Comment._meta.db_table)
+
+
+def view_queryset(view_class, request, **kwargs):
+    """Собрать queryset так же, как его строит представление."""
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()[:view.paginate_by]
+
+
+def full_scans(plan):
+    """Строки плана, в которых горячая таблица читается целиком."""
+    found = []
+    for line in plan.splitlines():
+        for table in HOT_TABLES:
+            if connection.vendor == 'sqlite':
+                is_scan = (
+                    f'SCAN {table}' in line
+                    and 'USING' not in line.split(f'SCAN {table}', 1)[1]
+                )
+            else:
+                is_scan = f'Seq Scan on {table}' in line
+            if is_scan:
+                found.append(line.strip())
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для запросов лент и страницы публикации '
+        'и завершается ошибкой, если запрос читает таблицу целиком.'
+    )
+
+    def get_queries(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.first()
+        post = Post.only_author_objects.first()
+        slug = category.slug if category else 'category'
+        username = author.username if author else 'author'
+        post_id = post.pk if post else 1
+        views = (
+            ('blog:index', PostListView, {}),
+            ('blog:category_posts', CategoryPostsListView,
+             {'category_slug': slug}),
+            ('blog:profile', UserPageListView, {'username': username}),
+        )
+        queries = []
+        for name, view_class, kwargs in views:
+            try:
+                queries.append(
+                    (name, view_queryset(view_class, request, **kwargs))
+                )
+            except Http404:
+                # В базе нет объекта, чью страницу можно построить
+                self.stdout.write(self.style.WARNING(
+                    f'{name}: пропущено, в базе нет данных для страницы'
+                ))
+        return queries + [
+            ('blog:post_detail', Post.only_author_objects.filter(
+                pk=post_id)),
+            ('blog:post_detail comments', Comment.objects.filter(
+                post_id=post_id).order_by('pub_date')),
+        ]
+
+    def handle(self, *args, **options):
+        failed = []
+        for name, queryset in self.get_queries():
+            plan = queryset.explain()
+            scans = full_scans(plan)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            if scans:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: полный просмотр таблицы: {"; ".join(scans)}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        if failed:
+            raise CommandError(
+                'Запросы без подходящего индекса: ' + ', '.join(failed)
+            )
@@ -0,0 +1,71 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.images import variant_names
+from blog.models import ImageJob, Post
+
+IMAGES_DIR = Post._meta.get_field('image').upload_to
+
+
+def walk(storage, directory):
+    """Все файлы каталога хранилища, включая вложенные."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений и их уменьшенные копии, на которые '
+        'не ссылается ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, которые будут удалены.',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help=(
+                'Не трогать файлы моложе указанного числа секунд: их могли '
+                'загрузить для ещё не сохранённой публикации.'
+            ),
+        )
+
+    def referenced(self):
+        names = set(
+            Post.only_author_objects.exclude(image='').values_list(
+                'image', flat=True
+            )
+        )
+        names.update(ImageJob.objects.values_list('image_name', flat=True))
+        for name in list(names):
+            names.update(variant_names(name))
+        return names
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        referenced = self.referenced()
+        border = timezone.now() - timedelta(seconds=options['min_age'])
+        removed = size = 0
+        for name in walk(storage, IMAGES_DIR):
+            if name in referenced or storage.get_modified_time(name) > border:
+                continue
+            removed += 1
+            size += storage.size(name)
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+            if not options['dry_run']:
+                storage.delete(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {removed}, {size / 2 ** 20:.1f} МБ'
+        ))
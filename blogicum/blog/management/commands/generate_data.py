@@ -0,0 +1,260 @@
+import itertools
+import random
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from blog.cache import forget_listing_counts, invalidate_pages
+from blog.models import (
+    Category, Comment, ImageJob, Location, Post, PublicationJob
+)
+from users.forms import User
+
+try:
+    from faker import Faker
+except ImportError:
+    Faker = None
+
+WORDS = (
+    'путешествие город море горы лес река дорога утро вечер книга '
+    'история встреча друзья поезд музей парк улица небо солнце дождь'
+).split()
+
+
+class Lorem:
+    """Замена Faker, если он не установлен."""
+
+    def __init__(self, rnd):
+        self.rnd = rnd
+
+    def sentence(self):
+        words = self.rnd.choices(WORDS, k=self.rnd.randint(4, 9))
+        return ' '.join(words).capitalize() + '.'
+
+    def text(self):
+        return ' '.join(
+            self.sentence() for _ in range(self.rnd.randint(3, 8))
+        )
+
+
+def zipf_weights(size, exponent):
+    """Кумулятивные веса: первые элементы выбираются намного чаще."""
+    return list(itertools.accumulate(
+        1 / (rank ** exponent) for rank in range(1, size + 1)
+    ))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, публикациями '
+        'и комментариями для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=50_000)
+        parser.add_argument(
+            '--comments-per-post', type=float, default=5,
+            help='Среднее число комментариев к публикации.',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help=(
+                'Показатель распределения Ципфа для авторов и категорий; '
+                '0 — равномерно.'
+            ),
+        )
+        parser.add_argument(
+            '--images', type=int, default=20,
+            help='Число разных изображений, которые получат публикации.',
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.3,
+            help='Доля публикаций с изображением.',
+        )
+        parser.add_argument(
+            '--future-ratio', type=float, default=0.02,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument(
+            '--password', default='load-test',
+            help='Пароль всех созданных пользователей.',
+        )
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['seed'])
+        if Faker is not None:
+            self.fake = Faker('ru_RU')
+            self.fake.seed_instance(options['seed'])
+        else:
+            self.fake = Lorem(self.rnd)
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        with transaction.atomic():
+            users = self.create_users(
+                prefix, options['users'], options['password']
+            )
+            categories = self.create_categories(
+                prefix, options['categories']
+            )
+            locations = Location.objects.bulk_create(
+                Location(name=f'{self.fake.sentence()[:200]} {index}')
+                for index in range(options['locations'])
+            )
+            images = self.create_images(prefix, options['images'])
+            posts = self.create_posts(
+                options, users, categories, locations, images
+            )
+            comments = self.create_comments(posts, users)
+        forget_listing_counts(
+            {'feed'}
+            | {f'category:{pk}' for pk in categories}
+            | {f'author:{pk}:{kind}' for pk in users
+               for kind in ('public', 'own')}
+        )
+        invalidate_pages()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий '
+            f'{len(categories)}, публикаций {len(posts)}, '
+            f'комментариев {comments}'
+        ))
+
+    def create_users(self, prefix, count, password):
+        password = make_password(password)
+        start = User.objects.filter(
+            username__startswith=f'{prefix}_user_'
+        ).count()
+        names = [f'{prefix}_user_{start + index}' for index in range(count)]
+        for batch in batched(names, self.batch_size):
+            User.objects.bulk_create(
+                User(username=name, password=password) for name in batch
+            )
+        return list(User.objects.filter(username__in=names).values_list(
+            'pk', flat=True
+        ))
+
+    def create_categories(self, prefix, count):
+        start = Category.objects.filter(
+            slug__startswith=f'{prefix}-'
+        ).count()
+        slugs = [f'{prefix}-{start + index}' for index in range(count)]
+        Category.objects.bulk_create(
+            Category(
+                title=self.fake.sentence()[:256],
+                description=self.fake.text(),
+                slug=slug,
+            )
+            for slug in slugs
+        )
+        return list(Category.objects.filter(slug__in=slugs).values_list(
+            'pk', flat=True
+        ))
+
+    def create_images(self, prefix, count):
+        storage = Post._meta.get_field('image').storage
+        names = []
+        for index in range(count):
+            image = Image.new('RGB', (1600, 1200), tuple(
+                self.rnd.randrange(256) for _ in range(3)
+            ))
+            buffer = BytesIO()
+            image.save(buffer, 'JPEG', quality=85)
+            names.append(storage.save(
+                f'posts_images/{prefix}_{index}.jpg',
+                ContentFile(buffer.getvalue()),
+            ))
+        return names
+
+    def create_posts(self, options, users, categories, locations, images):
+        now = timezone.now()
+        author_weights = zipf_weights(len(users), options['skew'])
+        category_weights = zipf_weights(len(categories), options['skew'])
+        mean_comments = options['comments_per_post']
+        last_pk = Post.only_author_objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+        def build():
+            for _ in range(options['posts']):
+                future = self.rnd.random() < options['future_ratio']
+                offset = timedelta(
+                    minutes=self.rnd.randint(1, options['days'] * 24 * 60)
+                )
+                with_image = images and (
+                    self.rnd.random() < options['image_ratio']
+                )
+                yield Post(
+                    title=self.fake.sentence()[:256],
+                    text=self.fake.text(),
+                    author_id=self.rnd.choices(
+                        users, cum_weights=author_weights
+                    )[0],
+                    category_id=self.rnd.choices(
+                        categories, cum_weights=category_weights
+                    )[0],
+                    location_id=(
+                        self.rnd.choice(locations).pk
+                        if locations and self.rnd.random() < 0.7 else None
+                    ),
+                    pub_date=now + offset if future else now - offset,
+                    is_live=not future,
+                    image=self.rnd.choice(images) if with_image else '',
+                    comment_count=int(self.rnd.expovariate(
+                        1 / mean_comments
+                    )) if mean_comments and not future else 0,
+                )
+
+        for batch in batched(build(), self.batch_size):
+            Post.objects.bulk_create(batch)
+        posts = list(Post.only_author_objects.filter(pk__gt=last_pk).values(
+            'pk', 'pub_date', 'is_live', 'image', 'comment_count'
+        ))
+        PublicationJob.objects.bulk_create(
+            (
+                PublicationJob(post_id=post['pk'], run_at=post['pub_date'])
+                for post in posts if not post['is_live']
+            ),
+            batch_size=self.batch_size,
+        )
+        ImageJob.objects.bulk_create(
+            (
+                ImageJob(post_id=post['pk'], image_name=post['image'])
+                for post in posts if post['image']
+            ),
+            batch_size=self.batch_size,
+        )
+        return posts
+
+    def create_comments(self, posts, users):
+        def build():
+            for post in posts:
+                for _ in range(post['comment_count']):
+                    yield Comment(
+                        text=self.fake.sentence(),
+                        author_id=self.rnd.choice(users),
+                        post_id=post['pk'],
+                    )
+
+        created = 0
+        for batch in batched(build(), self.batch_size):
+            Comment.objects.bulk_create(batch)
+            created += len(batch)
+        return created
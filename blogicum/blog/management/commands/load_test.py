@@ -0,0 +1,228 @@
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Post
+from blog.urlbuilder import build_url
+from users.forms import User
+
+DEFAULT_MIX = 'feed=40,category=15,profile=10,detail=30,comment=5'
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in Scenario.VIEWS:
+            raise CommandError(f'Неизвестное представление в --mix: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Scenario:
+    """Выбор адресов для запросов по данным из базы."""
+
+    VIEWS = ('feed', 'category', 'profile', 'detail', 'comment')
+
+    def __init__(self, rnd, sample_size):
+        self.rnd = rnd
+        self.categories = list(Category.objects.filter(
+            is_published=True
+        ).values_list('slug', flat=True)[:sample_size])
+        self.usernames = list(User.objects.values_list(
+            'username', flat=True
+        )[:sample_size])
+        self.post_ids = list(Post.objects.order_by('-pub_date').values_list(
+            'pk', flat=True
+        )[:sample_size])
+        if not (self.categories and self.usernames and self.post_ids):
+            raise CommandError(
+                'Нет данных для нагрузки: запустите generate_data.'
+            )
+
+    def page(self):
+        # Читатели в основном смотрят первые страницы
+        return min(int(self.rnd.expovariate(0.7)) + 1, 20)
+
+    def request(self, view):
+        rnd = self.rnd
+        if view == 'feed':
+            return 'GET', f'{build_url("blog:index")}?page={self.page()}'
+        if view == 'category':
+            return 'GET', '%s?page=%s' % (build_url(
+                'blog:category_posts',
+                category_slug=rnd.choice(self.categories),
+            ), self.page())
+        if view == 'profile':
+            return 'GET', build_url(
+                'blog:profile', username=rnd.choice(self.usernames)
+            )
+        if view == 'detail':
+            return 'GET', build_url(
+                'blog:post_detail', pk=rnd.choice(self.post_ids)
+            )
+        return 'POST', build_url(
+            'blog:add_comment', pk=rnd.choice(self.post_ids)
+        )
+
+
+class Client:
+    """HTTP-клиент одного виртуального пользователя со своими cookie."""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def send(self, method, path, data=None):
+        url = self.base_url + path
+        body = None
+        headers = {'Referer': url}
+        if method == 'POST':
+            data = dict(data or {}, csrfmiddlewaretoken=self.csrf_token())
+            body = urlencode(data).encode()
+            headers['X-CSRFToken'] = self.csrf_token()
+        request = Request(url, data=body, method=method, headers=headers)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            return error.code
+
+    def login(self, username, password):
+        login_path = '/auth/login/'
+        self.send('GET', login_path)
+        self.send('POST', login_path, {
+            'username': username, 'password': password,
+        })
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер смесью запросов к ленте, категориям, '
+        'профилям, публикациям и комментариям и выводит перцентили '
+        'задержки и пропускную способность по представлениям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки, секунды.',
+        )
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f'Веса представлений (по умолчанию {DEFAULT_MIX}).',
+        )
+        parser.add_argument(
+            '--username-prefix', default='load',
+            help='Префикс пользователей generate_data для комментариев.',
+        )
+        parser.add_argument('--password', default='load-test')
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--sample-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        rnd = random.Random(options['seed'])
+        self.scenario = Scenario(rnd, options['sample_size'])
+        self.options = options
+        self.views = list(mix)
+        self.weights = list(mix.values())
+        self.results = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['duration']
+        started = time.monotonic()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            workers = [
+                executor.submit(self.worker, index)
+                for index in range(options['concurrency'])
+            ]
+            for worker in workers:
+                worker.result()
+        self.report(time.monotonic() - started)
+
+    def worker(self, index):
+        options = self.options
+        client = Client(options['base_url'], options['timeout'])
+        if 'comment' in self.views:
+            client.login(
+                f'{options["username_prefix"]}_user_{index}',
+                options['password'],
+            )
+        rnd = random.Random(
+            None if options['seed'] is None else options['seed'] + index
+        )
+        while time.monotonic() < self.deadline:
+            view = rnd.choices(self.views, self.weights)[0]
+            with self.lock:
+                method, path = self.scenario.request(view)
+            data = (
+                {'text': f'Нагрузочный комментарий {index}'}
+                if method == 'POST' else None
+            )
+            start = time.perf_counter()
+            try:
+                status = client.send(method, path, data)
+            except (URLError, OSError):
+                status = None
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.results[view].append(elapsed)
+                if status is None or status >= 400:
+                    self.errors[view] += 1
+
+    def report(self, duration):
+        self.stdout.write(
+            f'{"представление":<10} {"запросов":>9} {"ошибок":>7} '
+            f'{"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} {"запр/с":>8}'
+        )
+        total = 0
+        for view in self.views:
+            timings = sorted(self.results[view])
+            if not timings:
+                continue
+            total += len(timings)
+            self.stdout.write(
+                f'{view:<10} {len(timings):>9} {self.errors[view]:>7} '
+                f'{percentile(timings, 0.50) * 1000:>9.1f} '
+                f'{percentile(timings, 0.95) * 1000:>9.1f} '
+                f'{percentile(timings, 0.99) * 1000:>9.1f} '
+                f'{len(timings) / duration:>8.1f}'
+            )
+        everything = sorted(
+            elapsed for timings in self.results.values()
+            for elapsed in timings
+        )
+        if everything:
+            self.stdout.write(self.style.SUCCESS(
+                f'Всего {total} запросов за {duration:.1f} с: '
+                f'{total / duration:.1f} запр/с, '
+                f'p50 {statistics.median(everything) * 1000:.1f} мс, '
+                f'p99 {percentile(everything, 0.99) * 1000:.1f} мс'
+            ))
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import image_queue
+from blog.images import generate_variants
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработчик очереди изображений: готовит копии в пуле процессов, '
+        'повторяет неудачные задания и отмечает готовые посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов (по умолчанию — по числу ядер).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=16,
+            help='Сколько заданий забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза при пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать то, что уже в очереди, и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        reset = image_queue.reset_running()
+        if reset:
+            self.stdout.write(f'Возвращено в очередь заданий: {reset}')
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=django.setup
+        ) as executor:
+            while True:
+                close_old_connections()
+                jobs = image_queue.claim(options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+                futures = [
+                    (job, executor.submit(generate_variants, job.image_name))
+                    for job in jobs
+                ]
+                for job, future in futures:
+                    try:
+                        future.result()
+                    except Exception as error:
+                        image_queue.fail(job, error)
+                        self.stderr.write(f'{job.image_name}: {error}')
+                    else:
+                        image_queue.complete(job)
+                        self.stdout.write(f'{job.image_name}: готово')
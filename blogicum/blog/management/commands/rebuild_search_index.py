@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.search import FTS_TABLE, optimize_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс публикаций по таблице '
+        'blog_post (нужно после записи в обход триггеров, например '
+        'загрузки дампа).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--optimize', action='store_true',
+            help='После перестройки слить сегменты индекса в один.',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if connections[alias].vendor != 'sqlite':
+            raise CommandError('Индекс FTS5 есть только в SQLite.')
+        rebuild_index(alias)
+        if options['optimize']:
+            optimize_index(alias)
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+            total = cursor.fetchone()[0]
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {total}')
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.scheduler import next_run_at, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Планировщик отложенных публикаций: открывает посты в момент '
+        'наступления pub_date и отправляет сигнал post_published.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать наступившие задания и завершиться.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Максимальная пауза между проверками очереди, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            post_ids = publish_due_posts()
+            if post_ids:
+                self.stdout.write(
+                    f'Опубликованы посты: {", ".join(map(str, post_ids))}'
+                )
+            if options['once']:
+                return
+            delay = options['poll_interval']
+            run_at = next_run_at()
+            if run_at is not None:
+                until_next = (run_at - timezone.now()).total_seconds()
+                delay = min(delay, max(until_next, 0))
+            time.sleep(delay)
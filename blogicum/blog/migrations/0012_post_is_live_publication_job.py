@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:05
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def schedule_existing_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PublicationJob = apps.get_model('blog', 'PublicationJob')
+    alias = schema_editor.connection.alias
+    now = timezone.now()
+    Post._base_manager.using(alias).filter(pub_date__lte=now).update(is_live=True)
+    PublicationJob.objects.using(alias).bulk_create(
+        PublicationJob(post_id=post_id, run_at=pub_date)
+        for post_id, pub_date in Post._base_manager.using(alias).filter(
+            pub_date__gt=now
+        ).values_list('id', 'pub_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_at', models.DateTimeField(db_index=True, verbose_name='Время публикации')),
+            ],
+            options={
+                'verbose_name': 'отложенная публикация',
+                'verbose_name_plural': 'Отложенные публикации',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Дата публикации наступила'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', True), ('is_published', True)), fields=['-pub_date'], name='post_live_pub_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='publicationjob',
+            name='post',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='publication_job', to='blog.post', verbose_name='Публикация'),
+        ),
+        migrations.RunPython(
+            schedule_existing_posts, migrations.RunPython.noop
+        ),
+    ]
@@ -1,7 +1,12 @@
 import datetime
 
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.utils import timezone
 
+from blog import images
+from blog.storage import post_image_storage
+from blog.urlbuilder import build_url
 from users.forms import User
 
 
@@ -9,8 +14,8 @@ class PostQuerySet(models.QuerySet):
     def based_filter(self):
         return self.select_related('category', 'location', 'author').filter(
             is_published=True,
+            is_live=True,
             category__is_published=True,
-            pub_date__lte=datetime.datetime.now(),
         )
 
     def all_filter(self):
@@ -72,6 +77,9 @@ class Category(CommonModel):
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return build_url('blog:category_posts', category_slug=self.slug)
+
 
 '''class Image(models.Model):
     image = models.ImageField(blank=True, upload_to='posts_images')'''
@@ -94,6 +102,31 @@ class Comment(models.Model):
         null=True
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('post', 'pub_date'),
+                name='comment_post_pub_date_idx',
+            ),
+        )
+
+    def get_absolute_url(self):
+        return '%s#comment_%s' % (
+            build_url('blog:post_detail', pk=self.post_id), self.pk
+        )
+
+    @property
+    def edit_url(self):
+        return build_url(
+            'blog:edit_comment', pk=self.post_id, comment_id=self.pk
+        )
+
+    @property
+    def delete_url(self):
+        return build_url(
+            'blog:delete_comment', pk=self.post_id, comment_id=self.pk
+        )
+
 
 class Post(CommonModel):
 
@@ -126,7 +159,23 @@ class Post(CommonModel):
         verbose_name='Категория',
     )
     image = models.ImageField(
-        verbose_name='Фото', blank=True, upload_to='posts_images'
+        verbose_name='Фото', blank=True, upload_to='posts_images',
+        storage=post_image_storage,
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    is_live = models.BooleanField(
+        verbose_name='Дата публикации наступила',
+        default=False,
+        editable=False,
+    )
+    image_variants_at = models.DateTimeField(
+        verbose_name='Копии изображения готовы',
+        null=True,
+        editable=False,
     )
     only_author_objects = PostManager()
     objects = PostPublishManager()
@@ -134,6 +183,166 @@ class Post(CommonModel):
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                name='post_live_pub_date_idx',
+                condition=models.Q(is_published=True, is_live=True),
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
+
+    def get_absolute_url(self):
+        return build_url('blog:post_detail', pk=self.pk)
+
+    @property
+    def edit_url(self):
+        return build_url('blog:edit_post', pk=self.pk)
+
+    @property
+    def delete_url(self):
+        return build_url('blog:delete_post', pk=self.pk)
+
+    @property
+    def add_comment_url(self):
+        return build_url('blog:add_comment', pk=self.pk)
+
+    @property
+    def comments_url(self):
+        return build_url('blog:comments', pk=self.pk)
+
+    @property
+    def image_webp_srcset(self):
+        return images.srcset(self.image.name, 'webp')
+
+    @property
+    def image_jpeg_srcset(self):
+        return images.srcset(self.image.name, 'jpg')
+
+    @property
+    def image_thumbnail_url(self):
+        return self.image.storage.url(images.variant_name(
+            self.image.name, settings.BLOG_IMAGE_THUMBNAIL_WIDTH, 'jpg'
+        ))
+
+    @property
+    def image_variants_ready(self):
+        return self.image_variants_at is not None
+
+    def pub_date_reached(self, now=None):
+        pub_date = self.pub_date
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date <= (now or timezone.now())
+
+    def save(self, *args, **kwargs):
+        self.is_live = self.pub_date_reached()
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Удалить пост, сначала убрав его комментарии одним DELETE.
+
+        Каскад Django выбрал бы комментарии и для каждого прислал
+        post_delete, а обработчик сдвигал бы счётчик удаляемого поста:
+        число запросов росло бы с числом комментариев. Сигналы
+        комментариев при этом не приходят — их обработчики меняют только
+        счётчик и кеш страниц, который сбрасывает удаление поста.
+        Удаление через QuerySet.delete() идёт обычным каскадом.
+        """
+        using = using or self._state.db
+        connection = connections[using]
+        with transaction.atomic(using=using, savepoint=False):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM {table} WHERE {column} = %s'.format(
+                        table=connection.ops.quote_name(
+                            Comment._meta.db_table
+                        ),
+                        column=connection.ops.quote_name(
+                            Comment._meta.get_field('post').column
+                        ),
+                    ),
+                    [self.pk],
+                )
+            return super().delete(using, keep_parents)
+
+
+class PublicationJob(models.Model):
+    """Задание планировщика: сделать пост видимым в момент run_at."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='publication_job',
+        verbose_name='Публикация',
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Время публикации',
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = 'отложенная публикация'
+        verbose_name_plural = 'Отложенные публикации'
+
+    def __str__(self):
+        return f'{self.post_id} @ {self.run_at}'
+
+
+class ImageJob(models.Model):
+    """Задание фоновой очереди: подготовить копии изображения поста."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Обрабатывается'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_job',
+        verbose_name='Публикация',
+    )
+    image_name = models.CharField(
+        verbose_name='Файл изображения',
+        max_length=255,
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    run_after = models.DateTimeField(
+        verbose_name='Не раньше',
+        default=timezone.now,
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='image_job_status_run_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image_name} ({self.status})'
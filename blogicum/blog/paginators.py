@@ -0,0 +1,169 @@
+import base64
+import binascii
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from blog.cache import get_listing_count
+from blog.search import seek_after_rank
+
+
+class KeysetPage:
+    """Страница курсорной пагинации: соседние страницы задаются курсорами."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<KeysetPage of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу (pub_date, id) вместо OFFSET.
+
+    По умолчанию объекты идут от новых к старым, descending=False
+    переворачивает порядок. Стоимость любой страницы одинакова: запрос
+    выбирает per_page + 1 строк начиная с курсора и не считает COUNT(*)
+    по всей выборке.
+    """
+
+    field = 'pub_date'
+
+    def __init__(self, object_list, per_page, field=None, descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.descending = descending
+        if field is not None:
+            self.field = field
+
+    def cursor_value(self, obj):
+        return getattr(obj, self.field).isoformat()
+
+    def parse_cursor_value(self, raw):
+        value = parse_datetime(raw)
+        if value is None:
+            raise ValueError(raw)
+        return value
+
+    def encode_cursor(self, obj):
+        value = '%s|%s' % (self.cursor_value(obj), obj.pk)
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value = base64.urlsafe_b64decode(cursor.encode()).decode()
+            raw_value, raw_pk = value.rsplit('|', 1)
+            return self.parse_cursor_value(raw_value), int(raw_pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidPage('Некорректный курсор страницы.')
+
+    def _seek(self, cursor, forward):
+        """Выборка строк за курсором в порядке обхода."""
+        field = self.field
+        ascending = forward != self.descending
+        queryset = self.object_list.order_by(
+            *((field, 'pk') if ascending else (f'-{field}', '-pk'))
+        )
+        if cursor is None:
+            return queryset
+        date, pk = self.decode_cursor(cursor)
+        if ascending:
+            return queryset.filter(**{f'{field}__gte': date}).filter(
+                Q(**{f'{field}__gt': date}) | Q(pk__gt=pk)
+            )
+        return queryset.filter(**{f'{field}__lte': date}).filter(
+            Q(**{f'{field}__lt': date}) | Q(pk__lt=pk)
+        )
+
+    def page(self, after=None, before=None):
+        """Вернуть страницу после курсора after или перед курсором before."""
+        if before:
+            rows = list(self._seek(before, False)[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows, self, True, has_previous)
+
+        rows = list(self._seek(after or None, True)[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next, bool(after))
+
+
+class SearchPaginator(KeysetPaginator):
+    """
+    Курсорная пагинация результатов полнотекстового поиска.
+
+    Порядок — по релевантности BM25 (чем меньше, тем лучше), при равной
+    релевантности — по id. Ожидает queryset из blog.search.search_posts().
+    """
+
+    field = 'search_rank'
+
+    def __init__(self, object_list, per_page):
+        super().__init__(object_list, per_page, descending=False)
+
+    def cursor_value(self, obj):
+        return repr(obj.search_rank)
+
+    def parse_cursor_value(self, raw):
+        return float(raw)
+
+    def _seek(self, cursor, forward):
+        queryset = self.object_list.order_by(
+            *(('search_rank', 'pk') if forward else ('-search_rank', '-pk'))
+        )
+        if cursor is None:
+            return queryset
+        rank, pk = self.decode_cursor(cursor)
+        return seek_after_rank(queryset, rank, pk, forward)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт число объектов из кеша счётчиков списков."""
+
+    def __init__(self, object_list, per_page, listing=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.listing = listing
+
+    @cached_property
+    def count(self):
+        if self.listing is None:
+            return super().count
+        return get_listing_count(self.listing, self.object_list)
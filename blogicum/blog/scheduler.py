@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post, PublicationJob
+from blog.signals import post_published
+
+
+def schedule_publication(post):
+    """Поставить пост с датой в будущем в очередь или снять с очереди."""
+    if post.is_live:
+        PublicationJob.objects.filter(post=post).delete()
+    else:
+        PublicationJob.objects.update_or_create(
+            post=post, defaults={'run_at': post.pub_date}
+        )
+
+
+def publish_due_posts(now=None):
+    """Открыть посты, чья дата публикации наступила, и оповестить кеши."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        post_ids = list(
+            PublicationJob.objects.filter(
+                run_at__lte=now
+            ).values_list('post_id', flat=True)
+        )
+        if not post_ids:
+            return []
+        Post.only_author_objects.filter(
+            pk__in=post_ids, pub_date__lte=now
+        ).update(is_live=True)
+        PublicationJob.objects.filter(post_id__in=post_ids).delete()
+    post_published.send(sender=Post, post_ids=post_ids)
+    return post_ids
+
+
+def next_run_at():
+    return PublicationJob.objects.order_by('run_at').values_list(
+        'run_at', flat=True
+    ).first()
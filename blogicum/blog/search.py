@@ -0,0 +1,97 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'blog_post_fts'
+RANK = f'{FTS_TABLE}.rank'
+WORD = re.compile(r'\w+')
+
+
+def is_available(queryset):
+    """Индекс FTS5 создаётся миграцией только на SQLite."""
+    return connections[queryset.db].vendor == 'sqlite'
+
+
+def match_expression(text):
+    """
+    Запрос пользователя -> выражение FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы FTS5 во вводе
+    не работали; последнее слово ищется по префиксу (поиск по мере
+    набора).
+    """
+    words = WORD.findall(text.lower())
+    if not words:
+        return None
+    terms = ['"%s"' % word for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(queryset, text):
+    """
+    Публикации из queryset, подходящие под запрос, с релевантностью
+    BM25 в атрибуте search_rank. Условия видимости задаёт сам queryset
+    (например, Post.objects с based_filter()).
+
+    Ранжируются только BLOG_SEARCH_WINDOW самых новых видимых совпадений
+    (rowid растёт вместе с id публикации): граница находится по индексу
+    без подсчёта BM25 тем же queryset, поэтому скрытые публикации место
+    в окне не занимают, а стоимость запроса не зависит от частоты слова.
+
+    Без FTS5 (не SQLite) — поиск подстрок по всем словам без ранжирования.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return queryset.none()
+    if not is_available(queryset):
+        condition = Q()
+        for word in WORD.findall(text):
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition)
+    table = queryset.model._meta.db_table
+    matches = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[expression],
+    )
+    # Отдельный, не вложенный через Subquery запрос: имена таблиц в
+    # extra() остаются без псевдонимов и относятся к подзапросу.
+    boundary = matches.order_by('-pk').values('pk')[
+        settings.BLOG_SEARCH_WINDOW - 1:settings.BLOG_SEARCH_WINDOW
+    ]
+    sql, params = boundary.query.get_compiler(matches.db).as_sql()
+    return matches.extra(
+        select={'search_rank': RANK},
+        where=[f'{table}.id >= COALESCE(({sql}), 0)'],
+        params=params,
+    )
+
+
+def seek_after_rank(queryset, rank, pk, forward=True):
+    """Строки после (forward) или перед курсором (rank, pk)."""
+    operator = '>' if forward else '<'
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        where=[
+            f'({RANK} {operator} %s OR ({RANK} = %s '
+            f'AND {table}.id {operator} %s))'
+        ],
+        params=[rank, rank, pk],
+    )
+
+
+def rebuild_index(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')"
+        )
+
+
+def optimize_index(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('optimize')"
+        )
@@ -0,0 +1,139 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import Signal, receiver
+
+from blog.cache import (
+    adjust_listing_counts, bump_version, forget_categories,
+    forget_feed_stamps, forget_listing_counts, instance_listings,
+    invalidate_pages, post_listings, post_state, state_listings
+)
+from blog import image_queue
+from blog.models import Category, Comment, Location, Post
+from users.forms import User
+
+# Пост(ы) стали видны читателям: аргумент post_ids
+post_published = Signal()
+
+
+def change_comment_count(post_id, delta):
+    """Сдвинуть счётчик комментариев поста одним UPDATE без гонок."""
+    if post_id is None:
+        return
+    Post.only_author_objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        change_comment_count(instance.post_id, 1)
+    invalidate_pages()
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+    invalidate_pages()
+
+
+CACHED_MODELS = {
+    Post: 'post',
+    Category: 'category',
+    Location: 'location',
+    User: 'user',
+}
+
+
+def bump_cached_object(sender, instance, **kwargs):
+    bump_version(CACHED_MODELS[sender], instance.pk)
+    invalidate_pages()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    forget_categories()
+    # Публикация категории меняет состав ленты и профилей целиком
+    author_ids = Post.only_author_objects.filter(
+        category_id=instance.pk
+    ).values_list('author_id', flat=True).distinct()
+    listings = ['feed', f'category:{instance.pk}'] + [
+        f'author:{author_id}:public' for author_id in author_ids
+    ]
+    forget_listing_counts(listings)
+    forget_feed_stamps(listings)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_cached_object, sender=model)
+    post_delete.connect(bump_cached_object, sender=model)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw, **kwargs):
+    from blog.scheduler import schedule_publication
+
+    if raw:
+        # loaddata сохраняет объекты в обход Post.save()
+        instance.is_live = instance.pub_date_reached()
+        Post.only_author_objects.filter(pk=instance.pk).update(
+            is_live=instance.is_live
+        )
+    schedule_publication(instance)
+    if instance.image and not instance.image_variants_ready:
+        image_queue.enqueue(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    # Прежние списки и картинка поста читаются одним запросом
+    state = post_state(instance.pk, 'image') if instance.pk else None
+    instance._old_state = state
+    instance._old_listings = state_listings(state)
+    if state is None or instance.image.name != state['image']:
+        instance.image_variants_at = None
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_listings(sender, instance, **kwargs):
+    instance._old_listings = (
+        post_listings(instance.pk) if instance.pk else set()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_listing_counts(sender, instance, **kwargs):
+    old = getattr(instance, '_old_listings', set())
+    new = instance_listings(
+        instance, getattr(instance, '_old_state', None)
+    )
+    adjust_listing_counts(new - old, 1)
+    adjust_listing_counts(old - new, -1)
+    # Правка поста меняет содержимое лент, даже если их состав прежний
+    forget_feed_stamps(old | new)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_listing_counts(sender, instance, **kwargs):
+    old = getattr(instance, '_old_listings', set())
+    adjust_listing_counts(old, -1)
+    forget_feed_stamps(old)
+
+
+@receiver(post_published, sender=Post)
+def post_went_live(sender, post_ids, **kwargs):
+    for post_id in post_ids:
+        bump_version('post', post_id)
+        listings = post_listings(post_id)
+        adjust_listing_counts(
+            {
+                listing for listing in listings
+                if not listing.endswith(':own')
+            },
+            1,
+        )
+        forget_feed_stamps(listings)
+    invalidate_pages()
@@ -0,0 +1,45 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, где имя файла — SHA-256 его содержимого.
+
+    posts_images/photo.JPG -> posts_images/3f/a1/3fa1...e9.jpg. Одинаковые
+    загрузки ложатся в один файл, а раз содержимое по имени не меняется,
+    его можно кешировать навсегда. Файлы удаляет только
+    collect_image_garbage: один файл может принадлежать нескольким постам.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:4], hexdigest + ext
+        )
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Файл снова нужен: свежее время изменения не даёт
+            # collect_image_garbage (--min-age) удалить его, пока
+            # новая публикация ещё не сохранена
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
+
+
+post_image_storage = ContentAddressedStorage()
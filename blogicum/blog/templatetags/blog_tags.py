@@ -0,0 +1,83 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import count, get_versions
+
+register = template.Library()
+
+POST_CARD_KEY = 'blog:post_card:{post}:{versions}:{comment_count}'
+
+
+def post_card_dependencies(post):
+    return (
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
+
+
+@register.simple_tag
+def post_cards(posts):
+    """
+    Карточки публикаций из кеша фрагментов.
+
+    Ключ карточки содержит версии поста, категории, местоположения и
+    автора, а также счётчик комментариев: любое их изменение даёт новый
+    ключ, и карточка перерисовывается.
+    """
+    posts = list(posts)
+    versions = get_versions({
+        dependency
+        for post in posts
+        for dependency in post_card_dependencies(post)
+    })
+    keys = [
+        POST_CARD_KEY.format(
+            post=post.pk,
+            versions='.'.join(
+                str(versions[dependency])
+                for dependency in post_card_dependencies(post)
+            ),
+            comment_count=post.comment_count,
+        )
+        for post in posts
+    ]
+    cached = cache.get_many(keys)
+    rendered = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            rendered[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+        cards.append(cached.get(key) or rendered[key])
+    if rendered:
+        cache.set_many(rendered, settings.BLOG_POST_CARD_TIMEOUT)
+    count('post_card_hits', len(cached))
+    count('post_card_misses', len(rendered))
+    return mark_safe(''.join(
+        f'<article class="mb-5">{card}</article>' for card in cards
+    ))
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """Номера страниц вокруг текущей плюс первая и последняя, с «…»."""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=settings.BLOG_PAGE_WINDOW,
+        on_ends=1,
+    )
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    """Изображение поста с адаптивными копиями в WebP и JPEG."""
+    return {
+        'post': post,
+        'variants_ready': post.image_variants_ready,
+    }
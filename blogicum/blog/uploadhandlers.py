@@ -0,0 +1,46 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload, TemporaryFileUploadHandler
+)
+
+logger = logging.getLogger('blog.uploads')
+
+
+class SizeLimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загрузку во временный файл и обрывает её, как только файл
+    превысил BLOG_MAX_IMAGE_SIZE, не дочитывая тело запроса.
+
+    Имена отвергнутых полей попадают в request.rejected_uploads.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.BLOG_MAX_IMAGE_SIZE
+        if request is not None:
+            request.rejected_uploads = set()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.started = time.perf_counter()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            self.request.rejected_uploads.add(self.field_name)
+            logger.warning(
+                'Загрузка %s отклонена: больше %s байт',
+                self.file_name, self.max_size,
+            )
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        logger.info(
+            'Загружен %s: %s байт за %.1f мс',
+            self.file_name, file_size,
+            (time.perf_counter() - self.started) * 1000,
+        )
+        return super().file_complete(file_size)
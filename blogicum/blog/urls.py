@@ -6,6 +6,10 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
+    path(
+        'feed/<str:feed_format>/', views.PostFeedView.as_view(), name='feed'
+    ),
     path(
         'posts/create/', views.PostCreateView.as_view(), name='create_post'
     ),
@@ -20,6 +24,10 @@ urlpatterns = [
         'posts/<int:pk>/delete/',
         views.PostDeleteView.as_view(), name='delete_post'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.CommentListView.as_view(), name='comments'
+    ),
     path(
         'posts/<int:pk>/comment/',
         views.CommentCreateView.as_view(), name='add_comment'
@@ -40,8 +48,16 @@ urlpatterns = [
         'profile/<str:username>/',
         views.UserPageListView.as_view(), name='profile'
     ),
+    path(
+        'profile/<str:username>/feed/<str:feed_format>/',
+        views.ProfileFeedView.as_view(), name='profile_feed'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.CategoryPostsListView.as_view(), name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/<str:feed_format>/',
+        views.CategoryFeedView.as_view(), name='category_feed'
+    ),
 ]
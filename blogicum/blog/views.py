@@ -1,88 +1,234 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.generic import (
-    ListView, CreateView, DeleteView, UpdateView, DetailView
+    ListView, CreateView, DeleteView, UpdateView, DetailView, View
 )
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from blog.cache import (
+    count, get_feed_stamp, get_published_category, page_cache_key
+)
+from blog.feeds import FORMATS as FEED_FORMATS
 from blog.models import Post, Category, Comment
 from blog.forms import PostForm, CommentForm
+from blog.paginators import (
+    CachedCountPaginator, KeysetPaginator, SearchPaginator
+)
+from blog.search import search_posts
+from blog.uploadhandlers import SizeLimitedUploadHandler
 from users.forms import User, UserForm
 
 
-class PostDetailView(DetailView):
+class AnonymousPageCacheMixin:
+    """
+    Кеш целых страниц для анонимных читателей.
+
+    Аутентифицированным пользователям страница всегда рендерится заново:
+    они видят кнопки редактирования и форму комментария. В ключ входят
+    только параметры строки запроса из page_cache_params.
+    """
+
+    page_cache_params = ('page', 'after', 'before')
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method != 'GET'
+            or request.user.is_authenticated
+            or not settings.BLOG_PAGE_CACHE_TIMEOUT
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.page_cache_params)
+        response = cache.get(key)
+        if response is not None:
+            count('page_hits')
+            return response
+        count('page_misses')
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, settings.BLOG_PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+
+
+class ListingCountMixin:
+    """Номера страниц без COUNT(*): число постов берётся из кеша."""
+
+    paginator_class = CachedCountPaginator
+    listing = None
+
+    def get_listing(self):
+        return self.listing
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, listing=self.get_listing(), **kwargs
+        )
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация списков публикаций по (pub_date, id)."""
+
+    pagination_mode = None
+    keyset_paginator_class = KeysetPaginator
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.BLOG_PAGINATION_MODE
+
+    def get_keyset_paginator(self, queryset, page_size):
+        return self.keyset_paginator_class(queryset, page_size)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def post_comments(post_id):
+    """Комментарии поста с авторами, от старых к новым."""
+    return Comment.objects.filter(post_id=post_id).select_related('author')
+
+
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     template_name = 'blog/detail.html'
+    replica_reads = True
+    page_cache_params = ()
 
     def get_queryset(self):
         return Post.only_author_objects.filter(
             id=self.kwargs['pk'],
-        )
+        ).select_related('author', 'category', 'location')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         form = CommentForm()
         context['form'] = form
-        comments = Comment.objects.filter(post__id=self.kwargs['pk'])
-        context['comments'] = comments
+        comments_page = KeysetPaginator(
+            post_comments(self.kwargs['pk']),
+            settings.BLOG_COMMENTS_PER_PAGE,
+            descending=False,
+        ).page()
+        context['comments'] = comments_page.object_list
+        context['comments_page'] = comments_page
         return context
 
 
-class CategoryPostsListView(ListView):
+class CommentListView(ListView):
+    """Фрагмент со следующей порцией комментариев для «Показать ещё»."""
+
+    template_name = 'includes/comment_list.html'
+    replica_reads = True
+    context_object_name = 'comments'
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            Post.only_author_objects.only('id'), pk=self.kwargs['pk']
+        )
+        paginator = KeysetPaginator(
+            post_comments(self.post.pk),
+            settings.BLOG_COMMENTS_PER_PAGE,
+            descending=False,
+        )
+        try:
+            self.comments_page = paginator.page(
+                after=self.request.GET.get('after')
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return self.comments_page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.post
+        context['comments_page'] = self.comments_page
+        return context
+
+
+class CategoryPostsListView(
+    AnonymousPageCacheMixin, ListingCountMixin, KeysetPaginationMixin,
+    ListView
+):
     template_name = 'blog/category.html'
+    replica_reads = True
     model = Category
     ordering = 'pub_date'
     paginate_by = 10
 
     def get_queryset(self):
-        category_slug = self.kwargs['category_slug']
+        self.category = get_published_category(self.kwargs['category_slug'])
         return Post.objects.filter(
-            category__slug=category_slug).select_related(
-            'category').annotate(
-            comment_count=Count('comment')
+            category_id=self.category.pk
         ).order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
-        )
+        context['category'] = self.category
         return context
 
+    def get_listing(self):
+        return f'category:{self.category.pk}'
 
-class UserPageListView(ListView):
+
+class UserPageListView(ListingCountMixin, KeysetPaginationMixin, ListView):
     template_name = 'blog/profile.html'
+    replica_reads = True
     paginate_by = 10
     model = Post
 
     def get_queryset(self):
-        username = self.kwargs['username']
-        if self.request.user.username == self.kwargs['username']:
-            posts = Post.only_author_objects
+        self.profile = get_object_or_404(
+            User, username=self.kwargs['username']
+        )
+        if self.request.user == self.profile:
+            posts = Post.only_author_objects.select_related(
+                'category', 'location'
+            )
         else:
             posts = Post.objects
 
         return posts.filter(
-            author__username=username
-        ).select_related('author').annotate(
-            comment_count=Count('comment')
-        ).order_by('-pub_date')
+            author_id=self.profile.pk
+        ).select_related('author').order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs['username'])
+        context['profile'] = self.profile
         return context
 
+    def get_listing(self):
+        scope = 'own' if self.request.user == self.profile else 'public'
+        return f'author:{self.profile.pk}:{scope}'
+
 
 class OnlyAuthorMixin(UserPassesTestMixin):
 
+    def get_object(self, queryset=None):
+        # Объект нужен и проверке автора, и обработчику: читается один раз
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object(queryset)
+        return self._object
+
     def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class OnlyUserMixin(UserPassesTestMixin):
@@ -97,10 +243,6 @@ class UserUpdateView(OnlyUserMixin, UpdateView):
     form_class = UserForm
     template_name = 'blog/user.html'
 
-    def form_valid(self, form):
-        form.save()
-        return super().form_valid(form)
-
     def get_object(self, queryset=None):
         username = self.request.user.username
         return get_object_or_404(User, username=username)
@@ -112,7 +254,28 @@ class UserUpdateView(OnlyUserMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class ImageUploadMixin:
+    """
+    Потоковая загрузка изображения с ограничением размера.
+
+    Обработчики загрузки можно заменить только до того, как CSRF-проверка
+    прочитает request.POST, поэтому проверка переносится внутрь dispatch.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [SizeLimitedUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['rejected_uploads'] = getattr(
+            self.request, 'rejected_uploads', set()
+        )
+        return kwargs
+
+
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -128,14 +291,165 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostListView(ListView):
+class PostListView(
+    AnonymousPageCacheMixin, ListingCountMixin, KeysetPaginationMixin,
+    ListView
+):
     template_name = 'blog/index.html'
+    replica_reads = True
     model = Post
     paginate_by = 10
+    listing = 'feed'
 
     def get_queryset(self):
-        return Post.objects.annotate(
-            comment_count=Count('comment')).order_by('-pub_date')
+        return Post.objects.order_by('-pub_date')
+
+
+class PostSearchView(KeysetPaginationMixin, ListView):
+    """Полнотекстовый поиск по опубликованным постам."""
+
+    template_name = 'blog/search.html'
+    replica_reads = True
+    paginate_by = 10
+    pagination_mode = 'keyset'
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        query = self.get_query()
+        if not query:
+            return Post.objects.none()
+        return search_posts(Post.objects, query)
+
+    def get_keyset_paginator(self, queryset, page_size):
+        if 'search_rank' in queryset.query.extra:
+            return SearchPaginator(queryset, page_size)
+        return KeysetPaginator(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.get_query(), **kwargs)
+
+
+class PostFeedView(View):
+    """
+    RSS/Atom лента опубликованных постов.
+
+    Посты читаются через .iterator() и отдаются потоком. ETag и
+    Last-Modified берутся из кеша (get_feed_stamp), так что ответ 304
+    на опрос неизменившейся ленты не читает таблицу публикаций.
+    """
+
+    replica_reads = True
+    listing = 'feed'
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+
+    def get_queryset(self):
+        return Post.objects.all()
+
+    def get_listing(self):
+        return self.listing
+
+    def get_link(self):
+        return reverse('blog:index')
+
+    def get_title(self):
+        return self.title
+
+    def get_description(self):
+        return self.description
+
+    def feed_items(self, posts):
+        absolute = self.request.build_absolute_uri
+        for post in posts:
+            link = absolute(post.get_absolute_url())
+            yield {
+                'title': post.title,
+                'link': link,
+                'description': post.text,
+                'author_name': post.author.get_full_name()
+                or post.author.username,
+                'author_link': absolute(post.author.get_absolute_url()),
+                'pubdate': post.pub_date,
+                'unique_id': link,
+                'categories': [post.category.title] if post.category else (),
+            }
+
+    def get(self, request, feed_format, **kwargs):
+        feed_class = FEED_FORMATS.get(feed_format)
+        if feed_class is None:
+            raise Http404('Неизвестный формат ленты.')
+        queryset = self.get_queryset()
+        stamp, newest = get_feed_stamp(self.get_listing(), queryset)
+        etag = quote_etag(f'{stamp}-{feed_format}')
+        last_modified = int(newest.timestamp()) if newest else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+
+        feed = feed_class(
+            title=self.get_title(),
+            link=request.build_absolute_uri(self.get_link()),
+            description=self.get_description(),
+            feed_url=request.build_absolute_uri(),
+            language='ru',
+        )
+        feed.last_modified = newest
+        # База выбирается сейчас: поток читается уже после middleware
+        posts = queryset.using(queryset.db).order_by(
+            '-pub_date'
+        )[:settings.BLOG_FEED_SIZE]
+        response = StreamingHttpResponse(
+            feed.stream(self.feed_items(posts.iterator())),
+            content_type=feed.content_type,
+        )
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CategoryFeedView(PostFeedView):
+
+    def get_queryset(self):
+        self.category = get_published_category(self.kwargs['category_slug'])
+        return Post.objects.filter(category_id=self.category.pk)
+
+    def get_listing(self):
+        return f'category:{self.category.pk}'
+
+    def get_link(self):
+        return self.category.get_absolute_url()
+
+    def get_title(self):
+        return f'{self.title}: {self.category.title}'
+
+    def get_description(self):
+        return self.category.description
+
+
+class ProfileFeedView(PostFeedView):
+
+    def get_queryset(self):
+        self.profile = get_object_or_404(
+            User, username=self.kwargs['username']
+        )
+        return Post.objects.filter(author_id=self.profile.pk)
+
+    def get_listing(self):
+        return f'author:{self.profile.pk}:public'
+
+    def get_link(self):
+        return self.profile.get_absolute_url()
+
+    def get_title(self):
+        return f'{self.title}: {self.profile.username}'
+
+    def get_description(self):
+        return f'Публикации пользователя {self.profile.username}'
 
 
 class PostDeleteView(OnlyAuthorMixin, DeleteView):
@@ -143,9 +457,6 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Post, pk=self.kwargs['pk'])
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -155,18 +466,11 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
         return context
 
 
-class PostUpdateView(OnlyAuthorMixin, UpdateView):
+class PostUpdateView(ImageUploadMixin, OnlyAuthorMixin, UpdateView):
     form_class = PostForm
     model = Post
     template_name = 'blog/create.html'
 
-    def form_valid(self, form):
-        form.save()
-        return super().form_valid(form)
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Post, pk=self.kwargs['pk'])
-
     def get_success_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.kwargs['pk']})
 
@@ -189,28 +493,22 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     success_url = 'blog:post_detail'
 
     def form_valid(self, form):
-        post = get_object_or_404(Post, pk=self.kwargs['pk'])
-        comment = form.save(commit=False)
-        comment.post = post
+        form.instance.post = get_object_or_404(Post, pk=self.kwargs['pk'])
         form.instance.author = self.request.user
-        comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 
 class CommentDeleteView(OnlyAuthorMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
     success_url = 'blog:post_detail'
-
-    def get_object(self, queryset=None):
-        comment_id = self.kwargs.get('comment_id')
-        return get_object_or_404(Comment, pk=comment_id)
+    pk_url_kwarg = 'comment_id'
 
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 
 class CommentUpdateView(OnlyAuthorMixin, UpdateView):  # commentauthormixin
@@ -218,10 +516,7 @@ class CommentUpdateView(OnlyAuthorMixin, UpdateView):  # commentauthormixin
     form_class = CommentForm
     template_name = 'blog/comment.html'
     success_url = 'post_detail'
-
-    def get_object(self, queryset=None):
-        comment_id = self.kwargs.get('comment_id')
-        return get_object_or_404(Comment, pk=comment_id)
+    pk_url_kwarg = 'comment_id'
 
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+from importlib import import_module
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,16 +79,69 @@ TEMPLATES = [
     },
 ]
 
+# Рабочий режим шаблонов: кеширующий загрузчик и разбор всех шаблонов
+# при старте процесса, чтобы синтаксическая ошибка не дожидалась запроса
+BLOG_TEMPLATE_PRECOMPILE = not DEBUG
+
+if BLOG_TEMPLATE_PRECOMPILE:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    )]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Пул соединений на процесс для каждого псевдонима: сколько соединений
+# держать и сколько секунд ждать свободного
+BLOG_DATABASE_POOL = {'max_size': 10, 'timeout': 5}
+
+# core.db — SQLite с WAL и прагмами для конкурентного доступа;
+# readonly открывает тот же файл только для чтения. Реплики — любые
+# псевдонимы из BLOG_READ_DATABASES; локально их можно заменить копиями
+# db.sqlite3, которые обновляет команда sync_replicas
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'pool': BLOG_DATABASE_POOL},
+    },
+    'readonly': {
+        'ENGINE': 'core.db',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'read_only': True, 'pool': BLOG_DATABASE_POOL},
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Реплики для чтения в представлениях с replica_reads = True и способ
+# выбора реплики: 'round_robin' или 'least_latency'
+BLOG_READ_DATABASES = ['readonly']
+BLOG_REPLICA_SELECTION = 'round_robin'
+
+# Сколько секунд после записи клиент читает только из default
+BLOG_PRIMARY_STICKY_SECONDS = 10
+
+# Кеш общий для всех процессов: версии карточек и страниц, счётчики
+# списков и штампы лент меняются и в воркерах WSGI, и в run_publisher,
+# process_image_jobs, generate_data; cache_stats читает счётчики из
+# отдельного процесса. LocMemCache у каждого процесса свой, поэтому не
+# подходит. Внешний сервис не нужен: записи лежат файлами в cache/.
+# core.cache добавляет файловому кешу атомарные add() и incr(), на которых
+# держатся счётчики списков и cache_stats
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
     }
 }
 
@@ -132,6 +188,17 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Без DEBUG collectstatic добавляет в имена файлов хеш содержимого
+# и складывает рядом сжатые копии
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Отдавать собранную статику из STATIC_ROOT прямо из WSGI-приложения,
+# когда перед ним нет отдельного веб-сервера
+BLOG_SERVE_STATIC = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -143,8 +210,124 @@ LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
+# Модуль приложения импортируется при вызове: настройки читаются до
+# загрузки приложений и не должны сами их импортировать
+ABSOLUTE_URL_OVERRIDES = {
+    'auth.user': lambda user: import_module(
+        'blog.urlbuilder'
+    ).profile_url(user),
+}
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Отдавать загруженные файлы из MEDIA_ROOT прямо из WSGI-приложения без
+# DEBUG: файлы с хешем содержимого в имени кешируются навсегда
+# (Cache-Control: immutable), остальные проверяются по ETag
+BLOG_SERVE_MEDIA = False
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Режим пагинации лент публикаций: 'offset' (номера страниц)
+# или 'keyset' (курсоры по дате публикации, стоимость не зависит от глубины)
+BLOG_PAGINATION_MODE = 'offset'
+
+# Поиск ранжирует по BM25 не больше стольких самых новых совпадений:
+# для частых слов оценка всех совпадений стоит секунды
+BLOG_SEARCH_WINDOW = 5000
+
+# Сколько комментариев показывать на странице публикации и в «Показать ещё»
+BLOG_COMMENTS_PER_PAGE = 50
+
+# Время жизни закешированной карточки публикации, секунды
+BLOG_POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Кеш страниц ленты, категорий и публикаций для анонимных читателей,
+# секунды; 0 отключает кеш
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Счётчики публикаций для пагинатора: сколько хранить точное значение
+# и с какого размера списка вести его инкрементально как оценку; оценка
+# раз в BLOG_LARGE_LISTING_COUNT_TIMEOUT пересчитывается точно, чтобы
+# записи в обход сигналов не копили расхождение
+BLOG_LISTING_COUNT_TIMEOUT = 60 * 60
+BLOG_EXACT_COUNT_THRESHOLD = 10000
+BLOG_LARGE_LISTING_COUNT_TIMEOUT = 24 * 60 * 60
+
+# Сколько последних публикаций отдавать в RSS/Atom лентах
+BLOG_FEED_SIZE = 50
+# Сколько секунд хранить ETag и Last-Modified ленты без запроса к базе;
+# сигналы сбрасывают их раньше, таймаут ограничивает устаревание при
+# записи в обход сигналов. Неизменная лента после пересчёта сохраняет ETag
+BLOG_FEED_STAMP_TIMEOUT = 60
+
+# Сколько номеров страниц показывать по обе стороны от текущей
+BLOG_PAGE_WINDOW = 3
+
+# Ширины уменьшенных копий изображений публикаций (WebP и JPEG)
+# и ширина копии, которая подставляется в src карточки
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_THUMBNAIL_WIDTH = 640
+
+# Очередь обработки изображений: число попыток и задержка перед первым
+# повтором, секунды (дальше удваивается)
+BLOG_IMAGE_JOB_MAX_ATTEMPTS = 5
+BLOG_IMAGE_JOB_RETRY_DELAY = 30
+
+# Ограничения на изображения публикаций: размер файла (загрузка
+# обрывается, как только он превышен) и число пикселей по заголовку
+BLOG_MAX_IMAGE_SIZE = 10 * 2 ** 20
+BLOG_MAX_IMAGE_PIXELS = 40 * 10 ** 6
+
+# Заголовок Server-Timing с числом и временем SQL-запросов, временем
+# рендера и событиями кеша (см. core.middleware)
+BLOG_SERVER_TIMING = DEBUG
+
+# Бюджеты SQL-запросов на один запрос по имени представления, ключ
+# 'POST <имя>' — бюджет отправки формы (см. core.middleware.query_budget);
+# в строгом режиме (в тестах) превышение — ошибка, иначе предупреждение
+BLOG_QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:search': 6,
+    'blog:feed': 4,
+    'blog:category_feed': 4,
+    'blog:profile_feed': 4,
+    'blog:category_posts': 6,
+    'blog:profile': 8,
+    'blog:post_detail': 6,
+    'blog:comments': 6,
+    'blog:create_post': 8,
+    'blog:edit_post': 10,
+    'blog:delete_post': 10,
+    'blog:add_comment': 8,
+    'blog:edit_comment': 8,
+    'blog:delete_comment': 8,
+    'blog:edit_profile': 6,
+    'POST blog:create_post': 10,
+    'POST blog:edit_post': 10,
+    'POST blog:delete_post': 9,
+    'POST blog:add_comment': 5,
+    'POST blog:edit_comment': 4,
+    'POST blog:delete_comment': 5,
+    'POST blog:edit_profile': 6,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+BLOG_QUERY_BUDGET_STRICT = False
+
+# Отчёты приложения core — разбор шаблонов при запуске (core.templates),
+# строки запросов (core.requests), пулы соединений (core.db.pool) —
+# пишутся в stderr; без этой настройки сообщения уровня INFO теряются
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
@@ -6,6 +6,8 @@ from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
+from core.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls', namespace='blog')),
@@ -23,6 +25,8 @@ urlpatterns = [
         name='registration',
     ),
 ]
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += static(
+    settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT
+)
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
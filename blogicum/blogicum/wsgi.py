@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+if settings.BLOG_SERVE_STATIC or settings.BLOG_SERVE_MEDIA:
+    from core.static import CONTENT_HASHED, StaticFilesApp
+
+    if settings.BLOG_SERVE_STATIC:
+        application = StaticFilesApp(application)
+    if settings.BLOG_SERVE_MEDIA:
+        application = StaticFilesApp(
+            application, settings.MEDIA_ROOT, settings.MEDIA_URL,
+            hashed=CONTENT_HASHED,
+        )
@@ -0,0 +1,64 @@
+import os
+import pickle
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends import filebased
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.files import locks
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    """
+    Файловый кеш с атомарными add() и incr() между процессами.
+
+    В стандартном бэкенде incr() — это get() и set(): одновременные
+    приращения из разных процессов теряются, а set() заменяет таймаут
+    значения таймаутом по умолчанию. Здесь чтение и запись идут под
+    блокировкой файла в каталоге кеша, и срок жизни значения сохраняется.
+    """
+
+    lock_name = 'atomic.lock'
+
+    @contextmanager
+    def atomic(self):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), 'ab') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock)
+
+    def _read(self, key, version):
+        """(значение, оставшийся таймаут) или None, если ключа нет."""
+        try:
+            with open(self._key_to_file(key, version), 'rb') as f:
+                expiry = pickle.load(f)
+                if expiry is None:
+                    timeout = None
+                else:
+                    timeout = expiry - time.time()
+                    if timeout <= 0:
+                        return None
+                return pickle.loads(zlib.decompress(f.read())), timeout
+        except FileNotFoundError:
+            return None
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.atomic():
+            if self._read(key, version) is not None:
+                return False
+            self.set(key, value, timeout, version)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        with self.atomic():
+            found = self._read(key, version)
+            if found is None:
+                raise ValueError(f"Key '{key}' not found")
+            value, timeout = found
+            value += delta
+            self.set(key, value, timeout, version)
+            return value
@@ -0,0 +1,77 @@
+from pathlib import Path
+from urllib.parse import quote
+
+from django.db.backends.sqlite3 import base
+
+from core import metrics as request_metrics
+from core.db.pool import get_pool
+
+# Прагмы, которые выполняются на каждом новом соединении. WAL позволяет
+# читателям работать параллельно с писателем, NORMAL в WAL не теряет
+# согласованность при сбое, только последние транзакции.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 2 ** 20,
+    'temp_store': 'MEMORY',
+}
+# Прагмы, которые меняют файл базы и недоступны соединению только
+# для чтения
+WRITE_PRAGMAS = ('journal_mode',)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настройками для работы под нагрузкой.
+
+    Дополнительные ключи OPTIONS:
+    pragmas — прагмы поверх DEFAULT_PRAGMAS (None отключает прагму);
+    read_only — открыть файл в режиме только для чтения (mode=ro);
+    pool — параметры core.db.pool.ConnectionPool (max_size, timeout):
+    close() возвращает соединение в пул, а следующий connect() берёт его
+    оттуда вместо открытия файла заново.
+    Для базы в памяти (тесты) read_only и pool игнорируются.
+    """
+
+    _pool = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.read_only = params.pop('read_only', False)
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop('pragmas', {})}
+        self.pool_options = params.pop('pool', None)
+        if self.is_in_memory_db():
+            self.pool_options = None
+        if self.read_only and not self.is_in_memory_db():
+            path = Path(params['database']).resolve().as_posix()
+            params['database'] = f'file:{quote(path)}?mode=ro'
+        return params
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return self.open_connection(conn_params)
+        pool = get_pool(
+            self.alias, lambda: self.open_connection(conn_params),
+            **self.pool_options,
+        )
+        connection, waited = pool.acquire()
+        self._pool = pool
+        request_metrics.record_pool_wait(waited)
+        return connection
+
+    def open_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        read_only = self.read_only and not self.is_in_memory_db()
+        for name, value in self.pragmas.items():
+            if value is None or (read_only and name in WRITE_PRAGMAS):
+                continue
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _close(self):
+        pool, self._pool = self._pool, None
+        if pool is None or self.connection is None:
+            return super()._close()
+        pool.release(self.connection)
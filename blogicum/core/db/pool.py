@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from django.db.backends.sqlite3.base import Database
+
+logger = logging.getLogger('core.db.pool')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Database.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул соединений одного псевдонима базы.
+
+    acquire() отдаёт свободное соединение, проверив его запросом
+    SELECT 1, или открывает новое, пока их меньше max_size. Если все
+    заняты, ждёт до timeout секунд и бросает PoolTimeout. release()
+    откатывает незавершённую транзакцию и возвращает соединение в пул.
+    """
+
+    def __init__(self, alias, factory, max_size=10, timeout=5.0):
+        self.alias = alias
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+        self.peak_in_use = 0
+
+    @property
+    def in_use(self):
+        return self.size - len(self.idle)
+
+    def acquire(self):
+        """Вернуть (соединение, время ожидания в секундах)."""
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            if not self.idle and self.size >= self.max_size:
+                self.waits += 1
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    logger.warning(
+                        '%s: пул исчерпан: %s', self.alias, self.stats()
+                    )
+                    raise PoolTimeout(
+                        f'Пул соединений {self.alias} исчерпан: '
+                        f'{self.max_size} заняты дольше {self.timeout} с.'
+                    )
+                self.condition.wait(remaining)
+            connection = self.idle.pop() if self.idle else None
+            if connection is None:
+                self.size += 1
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            waited = time.perf_counter() - start
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+        if connection is not None and not self.healthy(connection):
+            # Место в пуле остаётся за этим вызовом, меняется соединение
+            self.discard(connection)
+            connection = None
+        if connection is None:
+            try:
+                connection = self.factory()
+            except Exception:
+                self.forget()
+                raise
+        return connection, waited
+
+    @staticmethod
+    def healthy(connection):
+        try:
+            connection.execute('SELECT 1').fetchone()
+        except Database.Error:
+            return False
+        return True
+
+    def release(self, connection):
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Database.Error:
+            self.discard(connection)
+            self.forget()
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection):
+        self.discarded += 1
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+        logger.warning('%s: соединение из пула не прошло проверку', self.alias)
+
+    def forget(self):
+        """Освободить место соединения, которое не вернётся в пул."""
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_all(self):
+        with self.condition:
+            while self.idle:
+                self.idle.pop().close()
+                self.size -= 1
+
+    def stats(self):
+        return {
+            'alias': self.alias,
+            'size': self.size,
+            'max_size': self.max_size,
+            'in_use': self.in_use,
+            'idle': len(self.idle),
+            'peak_in_use': self.peak_in_use,
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+            'wait_ms_total': round(self.wait_time * 1000, 2),
+            'wait_ms_max': round(self.max_wait * 1000, 2),
+            'timeouts': self.timeouts,
+            'discarded': self.discarded,
+        }
+
+
+def get_pool(alias, factory, **options):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(alias, factory, **options)
+        return pool
+
+
+def stats():
+    """Метрики всех пулов процесса."""
+    with _pools_lock:
+        return [pool.stats() for pool in _pools.values()]
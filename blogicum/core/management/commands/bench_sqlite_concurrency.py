@@ -0,0 +1,156 @@
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from blog.models import Post
+
+# Как CommentCreateView: комментарий и счётчик у публикации в одной
+# транзакции (без сигналов, чтобы не трогать кеш и основную базу)
+INSERT_COMMENT = (
+    'INSERT INTO blog_comment (text, pub_date, author_id, post_id) '
+    'VALUES (%s, %s, %s, %s)'
+)
+UPDATE_COUNT = (
+    'UPDATE blog_post SET comment_count = comment_count + 1 WHERE id = %s'
+)
+
+MODES = {
+    # Как было: стандартный бэкенд, журнал DELETE, чтение и запись
+    # через одно и то же соединение
+    'default': {
+        'writer': {'ENGINE': 'django.db.backends.sqlite3'},
+        'reader': None,
+    },
+    'tuned': {
+        'writer': {'ENGINE': 'core.db'},
+        'reader': {'ENGINE': 'core.db', 'OPTIONS': {'read_only': True}},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность чтения ленты во время '
+        'непрерывной записи комментариев на копии базы: стандартный '
+        'бэкенд SQLite против core.db (WAL, прагмы, отдельное чтение).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--modes', nargs='+', choices=list(MODES), default=list(MODES),
+        )
+
+    def handle(self, *args, **options):
+        source = Path(settings.DATABASES['default']['NAME'])
+        if not source.exists():
+            raise CommandError(f'Нет файла базы {source}.')
+        post = Post.only_author_objects.order_by('-pk').first()
+        if post is None:
+            raise CommandError(
+                'В базе нет публикаций: запустите generate_data.'
+            )
+        self.post_id, self.author_id = post.pk, post.author_id
+        self.stdout.write(
+            f'{"режим":<8} {"чтений/с":>9} {"p99 чтения, мс":>15} '
+            f'{"записей/с":>10} {"ошибок блокировки":>18}'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in options['modes']:
+                copy = Path(directory) / f'{mode}.sqlite3'
+                with sqlite3.connect(source) as original:
+                    original.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                shutil.copy(source, copy)
+                with sqlite3.connect(copy) as database:
+                    database.execute('PRAGMA journal_mode = DELETE')
+                self.run_mode(mode, copy, options)
+
+    def add_alias(self, alias, name, config):
+        connections.settings[alias] = {
+            **config, 'NAME': name, 'OPTIONS': config.get('OPTIONS', {}),
+        }
+        connections.ensure_defaults(alias)
+        connections.prepare_test_settings(alias)
+
+    def run_mode(self, mode, path, options):
+        writer = f'bench_{mode}_writer'
+        reader = f'bench_{mode}_reader'
+        self.add_alias(writer, path, MODES[mode]['writer'])
+        if MODES[mode]['reader'] is None:
+            reader = writer
+        else:
+            self.add_alias(reader, path, MODES[mode]['reader'])
+        self.read_times, self.writes, self.locked = [], 0, 0
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['duration']
+        threads = [
+            threading.Thread(target=self.write_loop, args=(writer,))
+            for _ in range(options['writers'])
+        ] + [
+            threading.Thread(target=self.read_loop, args=(reader,))
+            for _ in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = options['duration']
+        reads = sorted(self.read_times)
+        p99 = reads[int(len(reads) * 0.99)] * 1000 if reads else 0
+        self.stdout.write(
+            f'{mode:<8} {len(reads) / duration:>9.1f} {p99:>15.1f} '
+            f'{self.writes / duration:>10.1f} {self.locked:>18}'
+        )
+        if reads and options['verbosity'] > 1:
+            self.stdout.write(
+                f'  медиана чтения {statistics.median(reads) * 1000:.1f} мс'
+            )
+
+    def write_loop(self, alias):
+        try:
+            while time.monotonic() < self.deadline:
+                try:
+                    with transaction.atomic(using=alias):
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute(INSERT_COMMENT, (
+                                'Нагрузочный комментарий', timezone.now(),
+                                self.author_id, self.post_id,
+                            ))
+                            cursor.execute(UPDATE_COUNT, (self.post_id,))
+                except OperationalError:
+                    with self.lock:
+                        self.locked += 1
+                else:
+                    with self.lock:
+                        self.writes += 1
+        finally:
+            connections[alias].close()
+
+    def read_loop(self, alias):
+        try:
+            while time.monotonic() < self.deadline:
+                start = time.perf_counter()
+                try:
+                    list(Post.objects.using(alias).order_by(
+                        '-pub_date'
+                    )[:10])
+                except OperationalError:
+                    with self.lock:
+                        self.locked += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.read_times.append(elapsed)
+        finally:
+            connections[alias].close()
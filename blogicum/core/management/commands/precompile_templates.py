@@ -0,0 +1,25 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templates import precompile
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны проекта и выводит время разбора каждого; '
+        'завершается ошибкой, если шаблон содержит синтаксическую ошибку.'
+    )
+
+    def handle(self, *args, **options):
+        try:
+            timings = precompile(fresh=True)
+        except ImproperlyConfigured as error:
+            raise CommandError(error)
+        for name, elapsed in sorted(
+            timings, key=lambda item: item[1], reverse=True
+        ):
+            self.stdout.write(f'{elapsed * 1000:8.2f} мс  {name}')
+        total = sum(elapsed for _, elapsed in timings)
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов: {len(timings)}, всего {total * 1000:.1f} мс'
+        ))
@@ -0,0 +1,131 @@
+import re
+from pathlib import Path
+
+import django_bootstrap5
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+CSS_DIR = settings.BASE_DIR / 'static_dev' / 'css'
+# Классы, которые django_bootstrap5 собирает из частей во время работы
+SAFELIST = re.compile(
+    r'^(alert-\w+|btn-(sm|lg)|form-(control|select)-(sm|lg)'
+    r'|(in)?valid-\w+|is-(in)?valid|was-validated|show|collapsing|active)$'
+)
+COMMENT = re.compile(r'/\*(?!!).*?\*/', re.S)
+CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+IGNORED_PARTS = re.compile(r'"[^"]*"|\'[^\']*\'|:not\([^)]*\)')
+WORD = re.compile(r'[\w-]+')
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def source_files():
+    """Шаблоны и код, из которых берутся используемые классы."""
+    roots = [Path(directory) for directory in settings.TEMPLATES[0]['DIRS']]
+    roots += [
+        Path(config.path) for config in apps.get_app_configs()
+        if config.path.startswith(str(settings.BASE_DIR))
+    ]
+    roots.append(Path(django_bootstrap5.__file__).parent)
+    for root in roots:
+        for pattern in ('*.html', '*.py', '*.js'):
+            yield from root.rglob(pattern)
+
+
+def used_words():
+    words = set()
+    for path in source_files():
+        words.update(WORD.findall(path.read_text(encoding='utf-8')))
+    return words
+
+
+def split_selectors(prelude):
+    """Разбить список селекторов по запятым вне скобок."""
+    selectors, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def closing_brace(css, start):
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == '{':
+            depth += 1
+        elif css[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError('Несбалансированные фигурные скобки в CSS.')
+
+
+class Purger:
+    def __init__(self, used):
+        self.used = used
+
+    def keep(self, selector):
+        classes = CLASS.findall(IGNORED_PARTS.sub('', selector))
+        return all(
+            name in self.used or SAFELIST.match(name) for name in classes
+        )
+
+    def purge(self, css):
+        out, position = [], 0
+        while True:
+            brace = css.find('{', position)
+            if brace == -1:
+                out.append(css[position:].strip())
+                return ''.join(out)
+            prelude = css[position:brace]
+            # Инструкции без блока (@charset, @import) идут перед правилом
+            statements, _, prelude = prelude.rpartition(';')
+            if statements:
+                out.append(statements + ';')
+            end = closing_brace(css, brace)
+            body = css[brace + 1:end]
+            position = end + 1
+            head = prelude.strip()
+            if head.startswith(NESTED_AT_RULES):
+                inner = self.purge(body)
+                if inner:
+                    out.append(f'{head}{{{inner}}}')
+            elif head.startswith('@') or head.startswith('/*!'):
+                out.append(f'{head}{{{body}}}')
+            else:
+                selectors = [
+                    selector for selector in split_selectors(head)
+                    if self.keep(selector)
+                ]
+                if selectors:
+                    out.append(f'{",".join(selectors)}{{{body}}}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанную копию bootstrap.min.css только с теми '
+        'классами, которые встречаются в шаблонах и коде проекта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default=str(CSS_DIR / 'bootstrap.min.css'),
+        )
+        parser.add_argument(
+            '--output', default=str(CSS_DIR / 'bootstrap.purged.css'),
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        css = COMMENT.sub('', source.read_text(encoding='utf-8'))
+        purged = Purger(used_words()).purge(css)
+        Path(options['output']).write_text(purged + '\n', encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["output"]}: {len(purged)} из {len(css)} байт'
+        ))
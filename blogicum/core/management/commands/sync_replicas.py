@@ -0,0 +1,33 @@
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'BLOG_READ_DATABASES, чтобы проверять маршрутизацию чтения '
+        'на локальных копиях.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        source_path = Path(primary.settings_dict['NAME']).resolve()
+        copied = 0
+        for alias in settings.BLOG_READ_DATABASES:
+            replica = connections[alias]
+            target_path = Path(replica.settings_dict['NAME']).resolve()
+            if target_path == source_path:
+                continue
+            replica.close()
+            with sqlite3.connect(source_path) as source, \
+                    sqlite3.connect(target_path) as target:
+                source.backup(target)
+            copied += 1
+            self.stdout.write(f'{alias}: {target_path}')
+        self.stdout.write(self.style.SUCCESS(f'Обновлено реплик: {copied}'))
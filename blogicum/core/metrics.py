@@ -0,0 +1,51 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL, рендер шаблонов, события кеша."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.pool_wait = 0.0
+        self.counters = Counter()
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper()."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def current():
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def count(name, delta=1):
+    """Учесть событие в метриках текущего запроса, если он есть."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.counters[name] += delta
+
+
+def record_pool_wait(seconds):
+    """Учесть ожидание соединения из пула в метриках текущего запроса."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.pool_wait += seconds
@@ -0,0 +1,225 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics as request_metrics
+from core import routers
+from core.db import pool
+
+logger = logging.getLogger('core.requests')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(view_name, method):
+    """
+    Бюджет SQL-запросов представления для HTTP-метода.
+
+    Ключ вида 'POST blog:edit_post' в BLOG_QUERY_BUDGETS задаёт бюджет
+    метода, просто имя представления — бюджет по умолчанию.
+    """
+    budgets = settings.BLOG_QUERY_BUDGETS
+    return budgets.get(f'{method} {view_name}', budgets.get(view_name))
+
+
+class InstrumentationMiddleware:
+    """
+    Считает для каждого запроса SQL-запросы и их время, время рендера
+    шаблонов и события кеша.
+
+    Итог уходит в заголовок Server-Timing (если BLOG_SERVER_TIMING)
+    и в строку JSON в логгер core.requests вместе со снимком пулов
+    соединений процесса (занятость, ожидания, таймауты). Для
+    представлений из BLOG_QUERY_BUDGETS (см. query_budget) превышение
+    бюджета запросов пишется в лог как предупреждение, а при
+    BLOG_QUERY_BUDGET_STRICT — бросает QueryBudgetExceeded.
+
+    Тело потокового ответа (ленты) выполняет запросы уже после выхода
+    из представления, поэтому каждая его порция тоже считается, а лог
+    и проверка бюджета откладываются до конца тела. Заголовки к этому
+    времени отправлены: Server-Timing такого ответа содержит только
+    то, что измерено до начала тела.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request_metrics.RequestMetrics()
+        start = time.perf_counter()
+        with self.instrument(metrics):
+            response = self.get_response(request)
+        if settings.BLOG_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(
+                metrics, time.perf_counter() - start, pool.stats()
+            )
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, response, metrics,
+                start,
+            )
+        else:
+            self.finish(request, response, metrics, start)
+        return response
+
+    @staticmethod
+    @contextmanager
+    def instrument(metrics):
+        """Учитывать в metrics запросы ко всем базам и события кеша."""
+        token = request_metrics.activate(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.execute)
+                    )
+                yield
+        finally:
+            request_metrics.deactivate(token)
+
+    def stream(self, content, request, response, metrics, start):
+        chunks = iter(content)
+        try:
+            while True:
+                with self.instrument(metrics):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            self.finish(request, response, metrics, start)
+
+    def finish(self, request, response, metrics, start):
+        total = time.perf_counter() - start
+        view_name = (
+            request.resolver_match.view_name
+            if request.resolver_match else None
+        )
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'pool_wait_ms': round(metrics.pool_wait * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'cache': dict(metrics.counters),
+            'pools': pool.stats(),
+        }, ensure_ascii=False))
+        self.check_budget(view_name, request.method, metrics.queries)
+
+    def process_template_response(self, request, response):
+        metrics = request_metrics.current()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                metrics.template_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def server_timing(metrics, total, pools=()):
+        entries = [
+            f'db;dur={metrics.sql_time * 1000:.2f};'
+            f'desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.2f}',
+        ]
+        if metrics.pool_wait:
+            entries.append(f'pool;dur={metrics.pool_wait * 1000:.2f}')
+        for stats in pools:
+            entries.append(
+                f'pool-{stats["alias"]};desc="{stats["in_use"]}/'
+                f'{stats["max_size"]} in use, peak {stats["peak_in_use"]}, '
+                f'waits {stats["waits"]}, timeouts {stats["timeouts"]}"'
+            )
+        if metrics.counters:
+            events = ' '.join(
+                f'{name}={value}'
+                for name, value in sorted(metrics.counters.items())
+            )
+            entries.append(f'cache;desc="{events}"')
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+    @staticmethod
+    def check_budget(view_name, method, queries):
+        budget = query_budget(view_name, method)
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{method} {view_name}: {queries} SQL-запросов '
+            f'при бюджете {budget}'
+        )
+        if settings.BLOG_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Передаёт core.routers.ReplicaRouter подсказки представления.
+
+    Представление с атрибутом replica_reads = True читает из реплик.
+    После запроса с записью клиент получает cookie, и следующие
+    BLOG_PRIMARY_STICKY_SECONDS секунд все его чтения идут в default,
+    чтобы он увидел свои изменения (например, комментарий после
+    редиректа). Тело потокового ответа (ленты) читает с теми же
+    подсказками, что и представление.
+    """
+
+    cookie_name = 'db_primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        state = routers.RoutingState(pinned=pinned_until > time.time())
+        token = routers.activate(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.deactivate(token)
+        window = settings.BLOG_PRIMARY_STICKY_SECONDS
+        if state.wrote and window:
+            response.set_cookie(
+                self.cookie_name, str(time.time() + window),
+                max_age=window, httponly=True, samesite='Lax',
+            )
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, state
+            )
+        return response
+
+    @staticmethod
+    def stream(content, state):
+        chunks = iter(content)
+        while True:
+            token = routers.activate(state)
+            try:
+                chunk = next(chunks, None)
+            finally:
+                routers.deactivate(token)
+            if chunk is None:
+                return
+            yield chunk
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routers.current()
+        if state is not None:
+            view = getattr(view_func, 'view_class', view_func)
+            state.replica_reads = getattr(view, 'replica_reads', False)
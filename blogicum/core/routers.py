@@ -0,0 +1,145 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_state = ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    """
+    Маршрутизация одного запроса.
+
+    replica_reads — представление разрешило читать из реплик;
+    pinned — клиент недавно писал и читает из default;
+    wrote — в этом запросе уже была запись.
+    """
+
+    def __init__(self, pinned=False):
+        self.replica_reads = False
+        self.pinned = pinned
+        self.wrote = False
+
+
+def current():
+    return _state.get()
+
+
+def activate(state):
+    return _state.set(state)
+
+
+def deactivate(token):
+    _state.reset(token)
+
+
+class LatencyTracker:
+    """Экспоненциальное скользящее среднее времени запросов к реплике."""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.values = {}
+
+    def record(self, alias, elapsed):
+        previous = self.values.get(alias)
+        self.values[alias] = elapsed if previous is None else (
+            previous + self.alpha * (elapsed - previous)
+        )
+
+    def get(self, alias):
+        return self.values.get(alias, 0.0)
+
+
+latency = LatencyTracker()
+
+
+def _timed(alias):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            latency.record(alias, time.perf_counter() - start)
+    return wrapper
+
+
+@receiver(connection_created)
+def track_replica_latency(sender, connection, **kwargs):
+    if (
+        connection.alias in settings.BLOG_READ_DATABASES
+        and not getattr(connection, 'latency_tracked', False)
+    ):
+        # В начало списка: execute_wrapper() снимает последнюю обёртку
+        connection.execute_wrappers.insert(0, _timed(connection.alias))
+        connection.latency_tracked = True
+
+
+class ReplicaRouter:
+    """
+    Чтение — из реплик BLOG_READ_DATABASES, запись и миграции — в default.
+
+    В запросе к сайту реплики используются, только если у представления
+    replica_reads = True и клиент не писал в базу последние
+    BLOG_PRIMARY_STICKY_SECONDS (см. core.middleware). Вне запросов
+    (команды, shell, обработчики очередей) чтение идёт в default: реплика
+    может отставать, а команды сверяют прочитанное со своими же
+    записями. Внутри транзакции
+    default чтение остаётся на default, иначе оно не увидело бы ещё
+    не закоммиченные изменения.
+
+    Реплика выбирается по кругу или по наименьшей средней задержке
+    (BLOG_REPLICA_SELECTION). Реплики-зеркала базы в памяти (TEST MIRROR
+    в тестах) пропускаются.
+    """
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def replicas(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if not primary.is_in_memory_db():
+            return settings.BLOG_READ_DATABASES
+        return [
+            alias for alias in settings.BLOG_READ_DATABASES
+            if connections[alias].settings_dict['NAME']
+            != primary.settings_dict['NAME']
+        ]
+
+    def choose(self, replicas):
+        if settings.BLOG_REPLICA_SELECTION == 'least_latency':
+            return min(replicas, key=latency.get)
+        with self.lock:
+            index = next(self.counter)
+        return replicas[index % len(replicas)]
+
+    def db_for_read(self, model, **hints):
+        state = current()
+        if (
+            state is None or not state.replica_reads
+            or state.pinned or state.wrote
+        ):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = self.replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return self.choose(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = current()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
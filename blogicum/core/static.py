@@ -0,0 +1,93 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+from urllib.parse import unquote
+
+from django.conf import settings
+
+# Имя файла после ManifestStaticFilesStorage: style.0123456789ab.css
+HASHED = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+# Имя файла из ContentAddressedStorage или его уменьшенной копии
+CONTENT_HASHED = re.compile(r'(^|/)[0-9a-f]{64}(\.|_)[^/]*$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def read_chunks(file, size=64 * 1024):
+    with file:
+        yield from iter(lambda: file.read(size), b'')
+
+
+class StaticFilesApp:
+    """
+    WSGI-обёртка, которая отдаёт собранную статику из STATIC_ROOT в обход
+    Django.
+
+    Если клиент принимает br или gzip и рядом с файлом лежит сжатая
+    копия, отдаётся она. Файлы с хешем в имени кешируются навсегда,
+    остальные — с обязательной проверкой по ETag. Какие имена считать
+    хешированными, задаёт hashed: для загруженных файлов из MEDIA_ROOT
+    это CONTENT_HASHED.
+    """
+
+    def __init__(self, application, root=None, prefix=None, hashed=HASHED):
+        self.application = application
+        self.root = os.path.realpath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        self.hashed = hashed
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (
+            environ['REQUEST_METHOD'] not in ('GET', 'HEAD')
+            or not path.startswith(self.prefix)
+        ):
+            return self.application(environ, start_response)
+        filename = self.find(unquote(path[len(self.prefix):]))
+        if filename is None:
+            return self.application(environ, start_response)
+        return self.serve(environ, start_response, filename)
+
+    def find(self, name):
+        filename = os.path.realpath(os.path.join(self.root, name))
+        if not filename.startswith(self.root + os.sep):
+            return None
+        if not os.path.isfile(filename):
+            return None
+        return filename
+
+    def serve(self, environ, start_response, filename):
+        content_type, _ = mimetypes.guess_type(filename)
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Vary', 'Accept-Encoding'),
+            ('Cache-Control', (
+                IMMUTABLE if self.hashed.search(filename) else REVALIDATE
+            )),
+        ]
+        accepted = environ.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(filename + suffix):
+                filename += suffix
+                headers.append(('Content-Encoding', encoding))
+                break
+        stat = os.stat(filename)
+        etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+        headers += [
+            ('ETag', etag),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(stat.st_size)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(filename, 'rb')
+        wrapper = environ.get('wsgi.file_wrapper')
+        if wrapper is not None:
+            return wrapper(file)
+        return read_chunks(file)
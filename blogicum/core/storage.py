@@ -0,0 +1,46 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Расширения, которые имеет смысл сжимать: картинки png/jpg уже сжаты
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml')
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени и заранее сжатыми копиями.
+
+    Рядом с каждым css/js после collectstatic лежат .gz (и .br, если
+    установлен пакет brotli), которые отдаёт core.static.StaticFilesApp.
+    """
+
+    def post_process(self, *args, **kwargs):
+        for name, hashed_name, processed in super().post_process(
+            *args, **kwargs
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            with open(self.path(name + suffix), 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,65 @@
+import copy
+import logging
+import time
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger('core.templates')
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов TEMPLATES['DIRS']."""
+    for directory in engine.dirs:
+        root = Path(directory)
+        for path in sorted(root.rglob('*.html')):
+            yield path.relative_to(root).as_posix()
+
+
+def uncached(engine):
+    """Копия движка с теми же загрузчиками, но без кеширующего."""
+    loaders = []
+    for loader in engine.loaders:
+        if isinstance(loader, (tuple, list)) and loader[0] == CACHED_LOADER:
+            loaders.extend(loader[1])
+        else:
+            loaders.append(loader)
+    fresh = copy.copy(engine)
+    fresh.template_loaders = engine.get_template_loaders(loaders)
+    return fresh
+
+
+def precompile(alias='django', fresh=False):
+    """
+    Разобрать все шаблоны проекта, чтобы они попали в кеширующий загрузчик.
+
+    Возвращает список (имя, время разбора в секундах). Если хотя бы
+    один шаблон не разбирается, бросает ImproperlyConfigured со списком
+    ошибок. С fresh=True шаблоны разбираются заново в обход кеширующего
+    загрузчика (и не попадают в него): так время разбора честное, даже
+    если кеш уже заполнен при запуске.
+    """
+    engine = engines[alias].engine
+    if fresh:
+        engine = uncached(engine)
+    timings, errors = [], []
+    for name in template_names(engine):
+        start = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors.append(f'{name}: {error}')
+            continue
+        timings.append((name, time.perf_counter() - start))
+    if errors:
+        raise ImproperlyConfigured(
+            'Ошибки в шаблонах:\n' + '\n'.join(errors)
+        )
+    logger.info(
+        'Шаблонов разобрано: %d за %.1f мс',
+        len(timings), sum(elapsed for _, elapsed in timings) * 1000,
+    )
+    return timings
@@ -1,4 +1,8 @@
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from core.static import CONTENT_HASHED
 
 
 def csrf_failure(request, reason=''):
@@ -11,3 +15,20 @@ def page_not_found(request, exception):
 
 def server_error(request):
     return render(request, 'pages/500.html', status=500)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    Отдать загруженный файл; файлы с хешем содержимого в имени
+    кешируются браузером навсегда.
+
+    Маршрут подключается через static() только при DEBUG; без DEBUG
+    загруженные файлы отдаёт веб-сервер или StaticFilesApp
+    (BLOG_SERVE_MEDIA) с теми же заголовками.
+    """
+    response = serve(request, path, document_root, show_indexes)
+    if response.status_code == 200 and CONTENT_HASHED.search(path):
+        patch_cache_control(
+            response, public=True, max_age=31536000, immutable=True
+        )
+    return response
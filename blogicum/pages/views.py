@@ -39,11 +39,13 @@ about_list = [
 
 class AboutTemplateView(TemplateView):
     template_name = 'pages/about.html'
+    replica_reads = True
     about_list = about_list
 
 
 class RulesTemplateView(TemplateView):
     template_name = 'pages/rules.html'
+    replica_reads = True
     rules_list = rules_list
 
 
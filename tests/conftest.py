@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,27 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    # Файловый кеш тестов отдельно от кеша запущенного сайта
+    from django.conf import settings
+
+    caches = {
+        alias: {**config, 'LOCATION': tmp_path_factory.mktemp('cache')}
+        for alias, config in settings.CACHES.items()
+    }
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(cache_dir):
+    # Откат транзакции в тестах не откатывает кеш: счётчики и версии
+    # объектов с теми же id остались бы от предыдущего теста
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
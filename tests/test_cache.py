@@ -0,0 +1,51 @@
+import multiprocessing
+import time
+
+import pytest
+
+from core.cache import FileBasedCache
+
+N_PROCESSES = 4
+N_INCREMENTS = 50
+
+
+def hammer(location, backend):
+    cache = backend(location, {})
+    for _ in range(N_INCREMENTS):
+        if not cache.add('counter', 1, None):
+            cache.incr('counter')
+
+
+def run_concurrently(location, backend):
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=hammer, args=(location, backend))
+        for _ in range(N_PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    return backend(location, {}).get('counter')
+
+
+def test_incr_is_atomic_across_processes(tmp_path):
+    assert run_concurrently(str(tmp_path), FileBasedCache) == (
+        N_PROCESSES * N_INCREMENTS
+    ), 'Одновременные приращения из разных процессов не должны теряться.'
+
+
+def test_incr_keeps_timeout(tmp_path):
+    cache = FileBasedCache(str(tmp_path), {})
+    cache.set('forever', 1, None)
+    cache.set('brief', 1, 1)
+    assert cache.incr('forever', 2) == 3
+    assert cache.incr('brief') == 2
+    cache.decr('brief')
+    time.sleep(1.1)
+    assert cache.get('forever') == 3
+    assert cache.get('brief') is None
+    with pytest.raises(ValueError):
+        cache.incr('brief')
+    assert not cache.add('forever', 0)
+    assert cache.add('brief', 5)
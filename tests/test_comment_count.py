@@ -0,0 +1,103 @@
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Comment, Post
+
+
+def assert_counts_match():
+    stored = dict(
+        Post.only_author_objects.values_list('pk', 'comment_count')
+    )
+    counted = dict(
+        Post.only_author_objects.annotate(
+            total=Count('comment')
+        ).values_list('pk', 'total')
+    )
+    assert stored == counted, (
+        'Post.comment_count должен совпадать с числом комментариев поста.'
+    )
+
+
+@pytest.fixture
+def posts(mixer):
+    authors = mixer.cycle(2).blend(get_user_model())
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=mixer.sequence(*authors, authors[0]),
+        is_published=True, image='', location=None,
+        category__is_published=True,
+    )
+    for index, post in enumerate(posts):
+        mixer.cycle(index + 2).blend(
+            'blog.Comment', post=post, author=mixer.sequence(*authors),
+        )
+    return posts
+
+
+@pytest.mark.django_db
+def test_views_keep_comment_count(posts):
+    post = posts[0]
+    client = Client()
+    client.force_login(post.author)
+    client.post(
+        reverse('blog:add_comment', kwargs={'pk': post.pk}),
+        {'text': 'Новый комментарий'},
+    )
+    assert_counts_match()
+
+    comment = Comment.objects.filter(author=post.author).last()
+    client.post(reverse(
+        'blog:delete_comment',
+        kwargs={'pk': comment.post_id, 'comment_id': comment.pk},
+    ))
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+    assert_counts_match()
+
+
+@pytest.mark.django_db
+def test_deletes_keep_comment_count(posts):
+    Comment.objects.filter(post=posts[2])[:1].get().delete()
+    assert_counts_match()
+
+    Comment.objects.filter(post__in=posts[1:]).filter(
+        author=posts[1].author
+    ).delete()
+    assert_counts_match()
+
+    # Каскад: удаляются и посты автора, и его комментарии к чужим постам
+    posts[1].author.delete()
+    assert_counts_match()
+
+    posts[0].delete()
+    assert_counts_match()
+    Post.only_author_objects.all().delete()
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_recount_matches_comment_table(posts):
+    assert set(
+        Post.only_author_objects.values_list('comment_count', flat=True)
+    ) == {2, 3, 4}
+    Post.only_author_objects.update(comment_count=100)
+    call_command('recount_comments', stdout=StringIO())
+    assert_counts_match()
+
+
+@pytest.mark.django_db
+def test_migration_fills_comment_count(posts):
+    migration = import_module('blog.migrations.0010_post_comment_count')
+    Post.only_author_objects.update(comment_count=0)
+    migration.fill_comment_count(
+        apps, SimpleNamespace(connection=connection)
+    )
+    assert_counts_match()
@@ -0,0 +1,117 @@
+import json
+import logging
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from xml.dom import minidom
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def published_posts(mixer):
+    author = mixer.blend('auth.User')
+    category = mixer.blend('blog.Category', is_published=True)
+    return author, category, mixer.cycle(3).blend(
+        'blog.Post', author=author, category=category, location=None,
+        image='', is_published=True,
+        pub_date=(timezone.now() - timedelta(days=day) for day in range(
+            1, 4
+        )),
+    )
+
+
+def read_feed(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    return minidom.parseString(b''.join(response.streaming_content))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('feed_format, tag', [
+    ('rss', 'item'), ('atom', 'entry'),
+])
+def test_feeds_list_published_posts(client, published_posts, feed_format,
+                                    tag):
+    author, category, posts = published_posts
+    for url in (
+        reverse('blog:feed', args=[feed_format]),
+        reverse('blog:category_feed', args=[category.slug, feed_format]),
+        reverse('blog:profile_feed', args=[author.username, feed_format]),
+    ):
+        document = read_feed(client.get(url))
+        titles = [
+            node.getElementsByTagName('title')[0].firstChild.data
+            for node in document.getElementsByTagName(tag)
+        ]
+        assert titles == [post.title for post in posts]
+
+
+@pytest.mark.django_db
+def test_feed_conditional_get(client, published_posts):
+    _, _, posts = published_posts
+    url = reverse('blog:feed', args=['rss'])
+    response = client.get(url)
+    read_feed(response)
+    assert response['Last-Modified']
+
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not any('blog_post' in query['sql'] for query in queries)
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+    posts[-1].title = 'Исправленный заголовок'
+    posts[-1].save()
+    changed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert changed.status_code == HTTPStatus.OK
+    assert changed['ETag'] != response['ETag']
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_STAMP_TIMEOUT=1)
+def test_feed_stamp_expires(client, published_posts):
+    _, _, posts = published_posts
+    url = reverse('blog:feed', args=['atom'])
+    response = client.get(url)
+    etag, last_modified = response['ETag'], response['Last-Modified']
+    time.sleep(1.1)
+    # Пересчёт неизменившейся ленты даёт прежний ETag
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=last_modified,
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+    # Запись в обход сигналов видна после истечения штампа
+    Post.objects.filter(pk=posts[0].pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    time.sleep(1.1)
+    changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == HTTPStatus.OK
+    assert changed['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_streamed_queries_counted(client, published_posts, caplog):
+    with caplog.at_level(logging.INFO, logger='core.requests'), \
+            CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:feed', args=['rss']))
+        assert not caplog.records, 'Лог пишется после отдачи тела.'
+        read_feed(response)
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged['view'] == 'blog:feed'
+    assert logged['queries'] == len(queries)
+    assert any('blog_post' in query['sql'] for query in queries)
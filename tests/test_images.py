@@ -0,0 +1,146 @@
+import os
+import time
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from blog.cache import PAGES, get_versions
+from blog.models import ImageJob, Post
+from core.static import CONTENT_HASHED, StaticFilesApp
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def upload():
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), 'lightskyblue').save(buffer, 'PNG')
+    data = buffer.getvalue()
+
+    def make():
+        return SimpleUploadedFile('photo.png', data, 'image/png')
+
+    return make
+
+
+def orphans(min_age='0'):
+    out = StringIO()
+    call_command(
+        'collect_image_garbage', '--dry-run', '--min-age', min_age,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_identical_uploads_processed_once(mixer, media_root, upload):
+    posts = mixer.cycle(2).blend(
+        'blog.Post', image=(upload() for _ in range(2)), location=None,
+    )
+    assert posts[0].image.name == posts[1].image.name
+    assert ImageJob.objects.count() == 2
+
+    call_command(
+        'process_image_jobs', '--once', '--workers', '2', stdout=StringIO()
+    )
+
+    assert not ImageJob.objects.exists()
+    assert all(
+        post.image_variants_ready for post in Post.only_author_objects.all()
+    )
+    assert 'Будет удалено файлов: 0,' in orphans()
+
+    third = mixer.blend('blog.Post', image=upload(), location=None)
+    third.refresh_from_db()
+    assert third.image_variants_ready
+    assert not ImageJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reupload_protects_old_orphan(media_root, upload):
+    storage = Post._meta.get_field('image').storage
+    name = storage.save('posts_images/photo.png', upload())
+    week_ago = time.time() - 7 * 24 * 60 * 60
+    os.utime(storage.path(name), (week_ago, week_ago))
+    assert 'Будет удалено файлов: 1,' in orphans('3600')
+
+    assert storage.save('posts_images/again.png', upload()) == name
+    assert 'Будет удалено файлов: 0,' in orphans('3600')
+
+
+@pytest.mark.django_db
+def test_oversized_upload_rejected(
+    mixer, client, settings, media_root, upload
+):
+    settings.BLOG_MAX_IMAGE_SIZE = 512
+    author = mixer.blend(get_user_model())
+    category = mixer.blend('blog.Category', is_published=True)
+    client.force_login(author)
+    response = client.post(reverse('blog:create_post'), {
+        'title': 'Публикация', 'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%d %H:%M'),
+        'category': category.pk, 'image': upload(),
+    })
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['form'].errors['image'] == [
+        'Файл слишком большой: не больше 512\xa0байт.'
+    ]
+    assert not Post.only_author_objects.exists()
+    assert not list(media_root.rglob('*.png'))
+
+
+@pytest.mark.django_db
+def test_backfill_refreshes_cached_cards(mixer, media_root, upload):
+    post = mixer.blend('blog.Post', image=upload(), location=None)
+    keys = (('post', post.pk), PAGES)
+    before = get_versions(keys)
+
+    call_command(
+        'build_image_variants', '--workers', '1', stdout=StringIO()
+    )
+
+    post.refresh_from_db()
+    assert post.image_variants_ready
+    assert not ImageJob.objects.exists()
+    after = get_versions(keys)
+    assert all(after[key] != before[key] for key in keys), (
+        'После подготовки копий карточка поста и страницы должны '
+        'сбрасываться из кеша.'
+    )
+
+
+def test_media_served_immutable_without_debug(tmp_path):
+    hashed = f'{"a" * 64}.png'
+    (tmp_path / 'posts_images').mkdir()
+    for name in (hashed, 'photo.png'):
+        (tmp_path / 'posts_images' / name).write_bytes(b'png')
+    app = StaticFilesApp(
+        lambda environ, start_response: [], tmp_path, '/media/',
+        hashed=CONTENT_HASHED,
+    )
+
+    def headers(name):
+        sent = {}
+        app(
+            {'REQUEST_METHOD': 'GET',
+             'PATH_INFO': f'/media/posts_images/{name}'},
+            lambda status, headers: sent.update(headers, status=status),
+        )
+        return sent
+
+    assert headers(hashed)['status'] == '200 OK'
+    assert 'immutable' in headers(hashed)['Cache-Control']
+    assert 'immutable' not in headers('photo.png')['Cache-Control']
+    assert headers('../../etc/passwd') == {}
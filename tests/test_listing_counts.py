@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.paginators import CachedCountPaginator
+from blog.scheduler import publish_due_posts
+
+
+@pytest.fixture
+def site(mixer):
+    authors = mixer.cycle(2).blend(get_user_model())
+    categories = mixer.cycle(2).blend('blog.Category', is_published=True)
+    mixer.cycle(4).blend(
+        'blog.Post', author=mixer.sequence(*authors),
+        category=mixer.sequence(*categories), is_published=True,
+        image='', location=None,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    return {'authors': authors, 'categories': categories}
+
+
+def listings(site):
+    """Списки сайта и запросы, которые считают их посты напрямую."""
+    result = {'feed': Post.objects.all()}
+    for category in site['categories']:
+        result[f'category:{category.pk}'] = Post.objects.filter(
+            category=category
+        )
+    for author in site['authors']:
+        result[f'author:{author.pk}:public'] = Post.objects.filter(
+            author=author
+        )
+        result[f'author:{author.pk}:own'] = (
+            Post.only_author_objects.filter(author=author)
+        )
+    return result
+
+
+def assert_counts_match(site, write):
+    """Счётчики из кеша совпадают с COUNT(*) и после записи write."""
+    for listing, queryset in listings(site).items():
+        CachedCountPaginator(queryset, 10, listing=listing).count
+    write()
+    for listing, queryset in listings(site).items():
+        cached = CachedCountPaginator(queryset, 10, listing=listing).count
+        assert cached == queryset.count(), (
+            f'Число постов списка `{listing}` из кеша ({cached}) '
+            f'расходится с базой ({queryset.count()}).'
+        )
+
+
+@pytest.mark.django_db
+def test_counts_follow_post_writes(site, mixer):
+    author, other = site['authors']
+    category, other_category = site['categories']
+    post = Post.only_author_objects.filter(author=author).first()
+
+    def create():
+        mixer.blend(
+            'blog.Post', author=author, category=category,
+            is_published=True, image='', location=None,
+            pub_date=timezone.now() - timedelta(hours=1),
+        )
+
+    def move():
+        post.category = other_category
+        post.save()
+
+    def change_author():
+        post.author = other
+        post.save()
+
+    def unpublish():
+        post.is_published = False
+        post.save()
+
+    def publish():
+        post.is_published = True
+        post.save()
+
+    for write in (create, move, change_author, unpublish, publish,
+                  post.delete):
+        assert_counts_match(site, write)
+
+
+@pytest.mark.django_db
+def test_counts_follow_deferred_publication(site, mixer):
+    pub_date = timezone.now() + timedelta(days=1)
+
+    def schedule():
+        mixer.blend(
+            'blog.Post', author=site['authors'][0],
+            category=site['categories'][0], is_published=True,
+            image='', location=None, pub_date=pub_date,
+        )
+
+    assert_counts_match(site, schedule)
+    assert_counts_match(
+        site, lambda: publish_due_posts(now=pub_date + timedelta(seconds=1))
+    )
+
+
+@pytest.mark.django_db
+def test_counts_follow_category_and_author_changes(site):
+    category = site['categories'][0]
+
+    def hide_category():
+        category.is_published = False
+        category.save()
+
+    assert_counts_match(site, hide_category)
+    assert_counts_match(
+        site, lambda: Category.objects.filter(pk=category.pk).delete()
+    )
+    assert_counts_match(site, site['authors'][1].delete)
+
+
+@pytest.mark.django_db
+def test_counts_survive_stale_category(site):
+    category = site['categories'][0]
+    post = Post.only_author_objects.select_related('category').filter(
+        category=category
+    ).first()
+    category.is_published = False
+    category.save()
+
+    def save_loaded_earlier():
+        post.title = 'Правка'
+        post.save()
+
+    assert_counts_match(site, save_loaded_earlier)
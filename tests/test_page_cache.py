@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.cache import get_counter
+from blog.models import Post
+
+
+@pytest.fixture
+def posts(mixer):
+    return mixer.cycle(12).blend(
+        'blog.Post', is_published=True, image='', location=None,
+        category=mixer.blend('blog.Category', is_published=True),
+        pub_date=(
+            timezone.now() - timedelta(hours=hour) for hour in range(1, 13)
+        ),
+    )
+
+
+def page(client, url, **params):
+    return client.get(url, params).content.decode()
+
+
+def rename_quietly(post, title):
+    # update() обходит сигналы: страница в кеше остаётся прежней
+    Post.objects.filter(pk=post.pk).update(title=title)
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_cached(client, posts):
+    for url in (
+        reverse('blog:index'),
+        reverse('blog:category_posts', args=[posts[0].category.slug]),
+        reverse('blog:post_detail', args=[posts[0].pk]),
+    ):
+        first = page(client, url)
+        rename_quietly(posts[0], f'Скрытая правка {url}')
+        assert page(client, url) == first
+    assert get_counter('page_hits') == 3
+
+
+@pytest.mark.django_db
+def test_authenticated_users_bypass_cache(client, posts):
+    url = reverse('blog:index')
+    page(client, url)
+    counters = get_counter('page_hits'), get_counter('page_misses')
+
+    reader = Client()
+    reader.force_login(get_user_model().objects.create(username='reader'))
+    for _ in range(2):
+        assert 'reader' in page(reader, url)
+    assert (get_counter('page_hits'), get_counter('page_misses')) == (
+        counters
+    ), 'Страницы для вошедших пользователей не должны браться из кеша.'
+    assert 'reader' not in page(client, url)
+
+
+@pytest.mark.django_db
+def test_key_uses_only_view_parameters(client, posts):
+    url = reverse('blog:index')
+    first_page = page(client, url)
+    second_page = page(client, url, page=2)
+    assert posts[0].title in first_page
+    assert posts[0].title not in second_page
+    assert posts[-1].title in second_page
+
+    misses = get_counter('page_misses')
+    for noise in ('a', 'b', 'c'):
+        assert page(client, url, x=noise) == first_page
+        assert page(client, url, page=2, utm=noise) == second_page
+    assert get_counter('page_misses') == misses
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_pages(client, posts, mixer):
+    post = posts[0]
+    index = reverse('blog:index')
+    detail = reverse('blog:post_detail', args=[post.pk])
+    page(client, index)
+    page(client, detail)
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in page(client, index)
+
+    mixer.blend('blog.Comment', post=post, text='Свежий комментарий')
+    assert 'Свежий комментарий' in page(client, detail)
+
+    post.category.is_published = False
+    post.category.save()
+    assert 'Новый заголовок' not in page(client, index)
@@ -0,0 +1,130 @@
+import re
+from datetime import timedelta
+from html import unescape
+from http import HTTPStatus
+
+import pytest
+from django.core.paginator import InvalidPage
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.paginators import KeysetPaginator
+
+PER_PAGE = 4
+COMMENT_ANCHOR = re.compile(r'name="comment_(\d+)"')
+LOAD_MORE = re.compile(r'js-load-comments" href="([^"]+)"')
+
+
+@pytest.fixture
+def posts(mixer):
+    # По три публикации на одну дату: порядок внутри даты задаёт id
+    now = timezone.now()
+    return mixer.cycle(11).blend(
+        'blog.Post', is_published=True, image='', location=None,
+        category=mixer.blend('blog.Category', is_published=True),
+        pub_date=(
+            now - timedelta(hours=index // 3 + 1) for index in range(11)
+        ),
+    )
+
+
+def expected_ids():
+    return list(
+        Post.objects.order_by('-pub_date', '-pk').values_list('pk', flat=True)
+    )
+
+
+def walk(paginator):
+    """Пройти страницы вперёд по after, затем назад по before."""
+    forward, page = [], paginator.page()
+    assert not page.has_previous()
+    forward.append([post.pk for post in page])
+    while page.has_next():
+        page = paginator.page(after=page.next_cursor)
+        assert page.has_previous()
+        forward.append([post.pk for post in page])
+    backward = [[post.pk for post in page]]
+    while page.has_previous():
+        page = paginator.page(before=page.previous_cursor)
+        assert page.has_next()
+        backward.append([post.pk for post in page])
+    return forward, backward[::-1]
+
+
+@pytest.mark.django_db
+def test_after_and_before_round_trip_with_ties(posts):
+    forward, backward = walk(KeysetPaginator(Post.objects.all(), PER_PAGE))
+    assert sum(forward, []) == expected_ids()
+    assert all(len(page) == PER_PAGE for page in forward[:-1])
+    assert backward == forward
+
+
+@pytest.mark.django_db
+def test_ascending_round_trip(posts):
+    paginator = KeysetPaginator(
+        Post.objects.all(), PER_PAGE, descending=False
+    )
+    forward, backward = walk(paginator)
+    assert sum(forward, []) == expected_ids()[::-1]
+    assert backward == forward
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', ['не-курсор', 'MjAyMHwx', '%%%'])
+def test_bad_cursor(posts, cursor):
+    with pytest.raises(InvalidPage):
+        KeysetPaginator(Post.objects.all(), PER_PAGE).page(after=cursor)
+
+
+@pytest.mark.django_db
+def test_feed_keyset_mode(client, settings, posts):
+    settings.BLOG_PAGINATION_MODE = 'keyset'
+    url = reverse('blog:index')
+    seen, params = [], {}
+    while True:
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['page_obj']
+        seen += [post.pk for post in page]
+        if not page.has_next():
+            break
+        params = {'after': page.next_cursor}
+    assert seen == expected_ids()
+
+    for param in ('after', 'before'):
+        assert client.get(
+            url, {param: 'не-курсор'}
+        ).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_load_more_walks_every_comment(client, settings, posts, mixer):
+    settings.BLOG_COMMENTS_PER_PAGE = 3
+    post = posts[0]
+    comments = mixer.cycle(8).blend('blog.Comment', post=post)
+    # Часть комментариев с одинаковым временем: порядок внутри задаёт id
+    Comment.objects.filter(pk__in=[c.pk for c in comments[2:6]]).update(
+        pub_date=comments[2].pub_date
+    )
+    expected = list(
+        Comment.objects.filter(post=post).order_by(
+            'pub_date', 'pk'
+        ).values_list('pk', flat=True)
+    )
+
+    html = client.get(reverse('blog:post_detail', args=[post.pk])).content
+    seen = [int(pk) for pk in COMMENT_ANCHOR.findall(html.decode())]
+    more = LOAD_MORE.search(html.decode())
+    while more:
+        response = client.get(unescape(more.group(1)))
+        assert response.status_code == HTTPStatus.OK
+        fragment = response.content.decode()
+        assert '<html' not in fragment
+        seen += [int(pk) for pk in COMMENT_ANCHOR.findall(fragment)]
+        more = LOAD_MORE.search(fragment)
+    assert seen == expected
+
+    assert client.get(
+        reverse('blog:comments', args=[post.pk]), {'after': 'не-курсор'}
+    ).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,377 @@
+import random
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from io import BytesIO, StringIO
+from urllib.parse import urlencode
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from core.middleware import query_budget
+
+N_USERS = 100
+N_POSTS = 2000
+N_COMMENTS = 5000
+MAX_SECONDS = 1.0
+
+# (имя маршрута, аргументы по объектам сценария, клиент)
+CASES = (
+    ('blog:index', lambda objs: {}, 'anon'),
+    ('blog:index', lambda objs: {}, 'author'),
+    ('blog:search', lambda objs: {}, 'anon'),
+    ('blog:feed', lambda objs: {'feed_format': 'rss'}, 'anon'),
+    (
+        'blog:category_feed',
+        lambda objs: {
+            'category_slug': objs['category'].slug, 'feed_format': 'atom'
+        },
+        'anon',
+    ),
+    (
+        'blog:profile_feed',
+        lambda objs: {
+            'username': objs['author'].username, 'feed_format': 'rss'
+        },
+        'anon',
+    ),
+    ('blog:post_detail', lambda objs: {'pk': objs['post'].pk}, 'anon'),
+    ('blog:post_detail', lambda objs: {'pk': objs['post'].pk}, 'author'),
+    ('blog:comments', lambda objs: {'pk': objs['post'].pk}, 'anon'),
+    (
+        'blog:category_posts',
+        lambda objs: {'category_slug': objs['category'].slug},
+        'anon',
+    ),
+    (
+        'blog:profile',
+        lambda objs: {'username': objs['author'].username},
+        'anon',
+    ),
+    (
+        'blog:profile',
+        lambda objs: {'username': objs['author'].username},
+        'author',
+    ),
+    ('blog:create_post', lambda objs: {}, 'author'),
+    ('blog:edit_post', lambda objs: {'pk': objs['post'].pk}, 'author'),
+    ('blog:delete_post', lambda objs: {'pk': objs['post'].pk}, 'author'),
+    ('blog:add_comment', lambda objs: {'pk': objs['post'].pk}, 'author'),
+    (
+        'blog:edit_comment',
+        lambda objs: {
+            'pk': objs['post'].pk, 'comment_id': objs['comment'].pk
+        },
+        'author',
+    ),
+    (
+        'blog:delete_comment',
+        lambda objs: {
+            'pk': objs['post'].pk, 'comment_id': objs['comment'].pk
+        },
+        'author',
+    ),
+    ('blog:edit_profile', lambda objs: {}, 'author'),
+    ('pages:about', lambda objs: {}, 'anon'),
+    ('pages:rules', lambda objs: {}, 'anon'),
+)
+# Параметры строки запроса для маршрутов, которым они нужны
+QUERY_PARAMS = {
+    'blog:search': lambda objs: {'q': objs['post'].title},
+}
+
+
+
+def post_form(objs, image=False):
+    data = {
+        'title': 'Публикация', 'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%d %H:%M'),
+        'category': objs['category'].pk, 'location': objs['location'].pk,
+    }
+    if image:
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), 'lightskyblue').save(buffer, 'PNG')
+        data['image'] = SimpleUploadedFile(
+            'photo.png', buffer.getvalue(), 'image/png'
+        )
+    return data
+
+
+def doomed_post(objs):
+    """Пост с тем же числом комментариев, что у поста сценария."""
+    from blog.models import Comment, Post
+
+    post = Post.only_author_objects.create(
+        title='Удаляемая публикация', text='Текст', author=objs['author'],
+        category=objs['category'], is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    Comment.objects.bulk_create(
+        Comment(text='Комментарий', author=objs['author'], post=post)
+        for _ in range(objs['post'].comment_set.count())
+    )
+    return post
+
+
+def new_comment(objs):
+    from blog.models import Comment
+
+    return Comment.objects.create(
+        text='Комментарий', author=objs['author'], post=objs['post']
+    )
+
+
+# Запись от имени автора: (имя маршрута, аргументы, данные формы);
+# удаляемые объекты создаются заново перед каждым запросом
+POST_CASES = (
+    ('blog:create_post', lambda objs: {}, post_form),
+    (
+        'blog:create_post',
+        lambda objs: {},
+        lambda objs: post_form(objs, image=True),
+    ),
+    ('blog:edit_post', lambda objs: {'pk': objs['post'].pk}, post_form),
+    (
+        'blog:delete_post',
+        lambda objs: {'pk': doomed_post(objs).pk},
+        lambda objs: {},
+    ),
+    (
+        'blog:add_comment',
+        lambda objs: {'pk': objs['post'].pk},
+        lambda objs: {'text': 'Комментарий'},
+    ),
+    (
+        'blog:edit_comment',
+        lambda objs: {
+            'pk': objs['post'].pk, 'comment_id': objs['comment'].pk
+        },
+        lambda objs: {'text': 'Исправленный комментарий'},
+    ),
+    (
+        'blog:delete_comment',
+        lambda objs: {
+            'pk': objs['post'].pk, 'comment_id': new_comment(objs).pk
+        },
+        lambda objs: {},
+    ),
+    (
+        'blog:edit_profile',
+        lambda objs: {},
+        lambda objs: {
+            'username': objs['author'].username, 'first_name': 'Имя',
+            'last_name': 'Фамилия', 'password': objs['author'].password,
+        },
+    ),
+)
+
+
+@pytest.fixture
+def scenario(mixer: Mixer):
+    author = mixer.blend(get_user_model())
+    category = mixer.blend('blog.Category', is_published=True)
+    location = mixer.blend('blog.Location', is_published=True)
+    post = mixer.blend(
+        'blog.Post', author=author, category=category, location=location,
+        is_published=True, image='',
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    comment = mixer.blend('blog.Comment', author=author, post=post)
+    return {
+        'author': author, 'category': category, 'location': location,
+        'post': post, 'comment': comment,
+    }
+
+
+def seed_volume(objs):
+    """Добавить тысячи публикаций и комментариев вокруг сценария."""
+    from blog.models import Comment, Post
+
+    fake = Faker('ru_RU')
+    fake.seed_instance(0)
+    rnd = random.Random(0)
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'perf_{index}') for index in range(N_USERS)
+    )
+    authors = [objs['author'], *User.objects.filter(
+        username__startswith='perf_'
+    )]
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=fake.sentence()[:256],
+            text=fake.text(),
+            author=rnd.choice(authors),
+            category=objs['category'],
+            location=objs['location'],
+            pub_date=now - timedelta(minutes=rnd.randint(1, 10 ** 6)),
+            is_published=True,
+            is_live=True,
+        )
+        for _ in range(N_POSTS)
+    )
+    posts = [objs['post'], *Post.only_author_objects.order_by('?')[:50]]
+    Comment.objects.bulk_create(
+        Comment(
+            text=fake.sentence(),
+            author=rnd.choice(authors),
+            post=objs['post'] if index % 2 else rnd.choice(posts),
+        )
+        for index in range(N_COMMENTS)
+    )
+
+
+def measure(client, url, data=None):
+    """Запросы и время GET, а при data — отправки формы POST."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        if data is None:
+            response = client.get(url)
+        else:
+            response = client.post(url, data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - start
+    expected = HTTPStatus.OK if data is None else HTTPStatus.FOUND
+    assert response.status_code == expected, (
+        f'Страница `{url}` вернула статус {response.status_code}.'
+    )
+    return len(queries), elapsed
+
+
+def test_cases_cover_all_urls():
+    from blog.urls import app_name as blog_app, urlpatterns as blog_urls
+    from pages.urls import app_name as pages_app, urlpatterns as pages_urls
+
+    names = {f'{blog_app}:{pattern.name}' for pattern in blog_urls}
+    names |= {f'{pages_app}:{pattern.name}' for pattern in pages_urls}
+    missing = names - {name for name, _, _ in CASES}
+    assert not missing, (
+        'Добавьте в tests/test_performance.py проверку числа запросов '
+        f'для маршрутов: {", ".join(sorted(missing))}.'
+    )
+
+
+def test_post_cases_cover_write_urls():
+    from django.conf import settings
+
+    from blog.urls import app_name, urlpatterns
+
+    written = {name for name, _, _ in POST_CASES}
+    missing = {
+        f'{app_name}:{pattern.name}' for pattern in urlpatterns
+        if hasattr(getattr(pattern.callback, 'view_class', None), 'post')
+    } - written
+    assert not missing, (
+        'Добавьте в POST_CASES проверку отправки формы для маршрутов: '
+        f'{", ".join(sorted(missing))}.'
+    )
+    for name in written:
+        assert f'POST {name}' in settings.BLOG_QUERY_BUDGETS, (
+            f'Задайте бюджет `POST {name}` в BLOG_QUERY_BUDGETS.'
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'view_name, get_kwargs, client_kind', CASES,
+    ids=[f'{name}-{kind}' for name, _, kind in CASES],
+)
+@override_settings(BLOG_QUERY_BUDGET_STRICT=True)
+def test_query_count_independent_of_volume(
+    scenario, view_name, get_kwargs, client_kind
+):
+    from django.conf import settings
+
+    client = Client()
+    if client_kind == 'author':
+        client.force_login(scenario['author'])
+    url = reverse(view_name, kwargs=get_kwargs(scenario))
+    if view_name in QUERY_PARAMS:
+        url += '?' + urlencode(QUERY_PARAMS[view_name](scenario))
+    client.get(url)
+
+    small_queries, _ = measure(client, url)
+    seed_volume(scenario)
+    large_queries, elapsed = measure(client, url)
+
+    assert large_queries == small_queries, (
+        f'Число SQL-запросов страницы `{url}` зависит от объёма данных: '
+        f'{small_queries} на пустой базе и {large_queries} на '
+        f'{N_POSTS} публикациях.'
+    )
+    budget = query_budget(view_name, 'GET')
+    assert budget is not None, (
+        f'Задайте бюджет SQL-запросов для `{view_name}` '
+        'в BLOG_QUERY_BUDGETS.'
+    )
+    assert large_queries <= budget
+    assert elapsed < MAX_SECONDS, (
+        f'Страница `{url}` отвечала {elapsed:.2f} с на '
+        f'{N_POSTS} публикациях.'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'view_name, get_kwargs, get_data', POST_CASES,
+    ids=[
+        f'{name}-{index}' for index, (name, _, _) in enumerate(POST_CASES)
+    ],
+)
+@override_settings(BLOG_QUERY_BUDGET_STRICT=True)
+def test_write_query_count_independent_of_volume(
+    scenario, settings, tmp_path, view_name, get_kwargs, get_data
+):
+    settings.MEDIA_ROOT = tmp_path
+    client = Client()
+    client.force_login(scenario['author'])
+
+    def measure_write():
+        url = reverse(view_name, kwargs=get_kwargs(scenario))
+        return url, *measure(client, url, get_data(scenario))
+
+    url, small_queries, _ = measure_write()
+    seed_volume(scenario)
+    url, large_queries, elapsed = measure_write()
+
+    assert large_queries == small_queries, (
+        f'Число SQL-запросов при отправке `{url}` зависит от объёма '
+        f'данных: {small_queries} на пустой базе и {large_queries} на '
+        f'{N_POSTS} публикациях.'
+    )
+    budget = query_budget(view_name, 'POST')
+    assert large_queries <= budget, (
+        f'Отправка `{url}` выполнила {large_queries} SQL-запросов '
+        f'при бюджете {budget}.'
+    )
+    assert elapsed < MAX_SECONDS
+
+
+@pytest.mark.django_db
+def test_query_plans_on_empty_database():
+    out = StringIO()
+    call_command('check_query_plans', stdout=out)
+    assert 'blog:category_posts: пропущено' in out.getvalue()
+    assert 'blog:profile: пропущено' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_query_plans_pick_published_category(scenario, mixer):
+    mixer.blend('blog.Category', is_published=False, pk=0)
+    out = StringIO()
+    call_command('check_query_plans', stdout=out)
+    assert 'blog:category_posts: OK' in out.getvalue()
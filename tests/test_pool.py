@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from core.db import pool as pools
+from core.db.pool import ConnectionPool, Database, PoolTimeout
+
+
+@pytest.fixture
+def connect(tmp_path):
+    path = str(tmp_path / 'pool.sqlite3')
+    opened = []
+
+    def factory():
+        connection = Database.connect(path, check_same_thread=False)
+        opened.append(connection)
+        return connection
+
+    factory.opened = opened
+    return factory
+
+
+def in_thread(target):
+    """Запустить target в потоке; вернуть поток и список с результатом."""
+    result = []
+
+    def run():
+        try:
+            result.append(target())
+        except Exception as error:
+            result.append(error)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def test_timeout_when_exhausted(connect):
+    pool = ConnectionPool('test', connect, max_size=1, timeout=0.2)
+    pool.acquire()
+
+    started = time.monotonic()
+    thread, result = in_thread(pool.acquire)
+    thread.join(5)
+
+    assert isinstance(result[0], PoolTimeout)
+    assert time.monotonic() - started >= 0.2
+    assert pool.stats()['timeouts'] == 1
+    assert pool.size == 1
+
+
+def test_waiter_gets_released_connection(connect):
+    pool = ConnectionPool('test', connect, max_size=1, timeout=5)
+    connection, _ = pool.acquire()
+
+    thread, result = in_thread(pool.acquire)
+    time.sleep(0.1)
+    assert not result, 'Пока соединение занято, второй вызов должен ждать.'
+    pool.release(connection)
+    thread.join(5)
+
+    received, waited = result[0]
+    assert received is connection
+    assert waited >= 0.1
+    assert pool.stats()['waits'] == 1
+    assert len(connect.opened) == 1
+
+
+def test_unhealthy_connection_replaced(connect):
+    pool = ConnectionPool('test', connect, max_size=1, timeout=0.2)
+    connection, _ = pool.acquire()
+    pool.release(connection)
+    connection.close()
+
+    replacement, _ = pool.acquire()
+
+    assert replacement is not connection
+    assert pool.healthy(replacement)
+    assert pool.stats()['discarded'] == 1
+    assert pool.size == 1
+
+
+def test_release_rolls_back(connect):
+    pool = ConnectionPool('test', connect, max_size=1, timeout=0.2)
+    connection, _ = pool.acquire()
+    connection.execute('CREATE TABLE note (text TEXT)')
+    connection.commit()
+    connection.execute("INSERT INTO note VALUES ('черновик')")
+    assert connection.in_transaction
+    pool.release(connection)
+
+    connection, _ = pool.acquire()
+
+    assert not connection.in_transaction
+    assert connection.execute('SELECT COUNT(*) FROM note').fetchone() == (0,)
+
+
+def test_factory_failure_frees_slot(connect):
+    fail = threading.Event()
+
+    def flaky():
+        if not fail.is_set():
+            fail.wait(5)
+            raise Database.OperationalError('база недоступна')
+        return connect()
+
+    pool = ConnectionPool('test', flaky, max_size=1, timeout=5)
+    first, first_result = in_thread(pool.acquire)
+    while pool.size < 1:
+        time.sleep(0.01)
+    second, second_result = in_thread(pool.acquire)
+    time.sleep(0.1)
+    assert not second_result, 'Место в пуле занято открывающимся соединением.'
+
+    fail.set()
+    first.join(5)
+    second.join(5)
+
+    assert isinstance(first_result[0], Database.OperationalError)
+    connection, _ = second_result[0]
+    assert pool.healthy(connection)
+    assert pool.size == 1
+
+
+def test_threads_never_exceed_max_size(connect):
+    pool = ConnectionPool('test', connect, max_size=2, timeout=5)
+
+    def work():
+        connection, _ = pool.acquire()
+        connection.execute('SELECT 1').fetchone()
+        time.sleep(0.01)
+        pool.release(connection)
+
+    threads = [threading.Thread(target=work) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    stats = pool.stats()
+    assert stats['checkouts'] == 10
+    assert stats['peak_in_use'] == 2
+    assert stats['in_use'] == 0
+    assert len(connect.opened) == 2
+
+
+@pytest.mark.django_db
+def test_request_reports_pool_stats(client, settings, caplog, connect,
+                                    monkeypatch):
+    settings.BLOG_SERVER_TIMING = True
+    monkeypatch.setattr(pools, '_pools', {})
+    pool = pools.get_pool('test', connect, max_size=2, timeout=0.2)
+    pool.acquire()
+
+    with caplog.at_level(logging.INFO, logger='core.requests'):
+        response = client.get(reverse('blog:index'))
+
+    assert 'pool-test;desc="1/2 in use, peak 1, waits 0, timeouts 0"' in (
+        response['Server-Timing']
+    )
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged['pools'] == [pool.stats()]
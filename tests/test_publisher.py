@@ -0,0 +1,186 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post, PublicationJob
+from blog.scheduler import publish_due_posts
+from blog.signals import post_published
+
+BLOGICUM_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+# Настройки процессов сайта и планировщика: общая база-файл и общий кеш
+PROCESS_SETTINGS = '''
+from blogicum.settings import *  # noqa
+
+DATABASES = {{
+    alias: {{**config, 'NAME': {db!r}}}
+    for alias, config in DATABASES.items()
+}}
+CACHES = {{
+    alias: {{**config, 'LOCATION': {cache!r}}}
+    for alias, config in CACHES.items()
+}}
+'''
+
+# Процесс сайта: заполняет кеш страниц до публикации и читает ленту после
+WEB_PROCESS = '''
+import sys
+from datetime import timedelta
+
+import django
+
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+call_command('migrate', verbosity=0)
+author = get_user_model().objects.create(username='author')
+category = Category.objects.create(
+    title='Категория', slug='category', description='', is_published=True
+)
+post = Post.objects.create(
+    title='Отложенная публикация', text='Текст', author=author,
+    category=category, is_published=True,
+    pub_date=timezone.now() + timedelta(seconds=2),
+)
+client = Client(SERVER_NAME='localhost')
+
+
+def report(stage):
+    page = client.get('/').content.decode()
+    feed = client.get('/feed/rss/')
+    body = b''.join(feed.streaming_content).decode()
+    print(stage, post.title in page, post.title in body, feed['ETag'])
+    sys.stdout.flush()
+
+
+report('before')
+print('due', post.pub_date.timestamp())
+sys.stdout.flush()
+sys.stdin.readline()
+report('after')
+'''
+
+
+@pytest.fixture
+def future_post(mixer):
+    return mixer.blend(
+        'blog.Post', is_published=True, image='', location=None,
+        category__is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+def test_save_sets_is_live(future_post):
+    assert not future_post.is_live
+    future_post.pub_date = timezone.now() - timedelta(minutes=1)
+    future_post.save()
+    future_post.refresh_from_db()
+    assert future_post.is_live
+
+
+@pytest.mark.django_db
+def test_schedule_follows_pub_date(future_post):
+    job = PublicationJob.objects.get(post=future_post)
+    assert job.run_at == future_post.pub_date
+
+    future_post.pub_date += timedelta(days=1)
+    future_post.save()
+    job.refresh_from_db()
+    assert job.run_at == future_post.pub_date
+
+    future_post.pub_date = timezone.now() - timedelta(minutes=1)
+    future_post.save()
+    assert future_post.is_live
+    assert not PublicationJob.objects.filter(post=future_post).exists()
+
+    future_post.pub_date = timezone.now() + timedelta(hours=1)
+    future_post.save()
+    assert not future_post.is_live
+    assert PublicationJob.objects.get(
+        post=future_post
+    ).run_at == future_post.pub_date
+
+
+@pytest.mark.django_db
+def test_publish_due_posts(future_post, mixer):
+    later_post = mixer.blend(
+        'blog.Post', is_published=True, image='', location=None,
+        category=future_post.category,
+        pub_date=future_post.pub_date + timedelta(days=1),
+    )
+    sent = []
+
+    def receiver(sender, post_ids, **kwargs):
+        sent.append(post_ids)
+
+    post_published.connect(receiver, sender=Post)
+    try:
+        assert publish_due_posts() == []
+        published = publish_due_posts(
+            now=future_post.pub_date + timedelta(seconds=1)
+        )
+    finally:
+        post_published.disconnect(receiver, sender=Post)
+
+    assert published == [future_post.pk]
+    assert sent == [[future_post.pk]]
+    future_post.refresh_from_db()
+    later_post.refresh_from_db()
+    assert future_post.is_live and not later_post.is_live
+    assert list(
+        PublicationJob.objects.values_list('post_id', flat=True)
+    ) == [later_post.pk]
+    assert list(Post.objects.all()) == [future_post]
+
+
+def test_publisher_process_invalidates_web_process_cache(tmp_path):
+    (tmp_path / 'process_settings.py').write_text(PROCESS_SETTINGS.format(
+        db=str(tmp_path / 'db.sqlite3'), cache=str(tmp_path / 'cache'),
+    ))
+    (tmp_path / 'web_process.py').write_text(textwrap.dedent(WEB_PROCESS))
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'process_settings',
+        'PYTHONPATH': os.pathsep.join([str(tmp_path), str(BLOGICUM_DIR)]),
+    }
+    web = subprocess.Popen(
+        [sys.executable, str(tmp_path / 'web_process.py')],
+        cwd=BLOGICUM_DIR, env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    try:
+        _, in_page, in_feed, etag = web.stdout.readline().split()
+        assert (in_page, in_feed) == ('False', 'False')
+        due = float(web.stdout.readline().split()[1])
+        time.sleep(max(due - time.time(), 0) + 0.1)
+
+        subprocess.run(
+            [sys.executable, 'manage.py', 'run_publisher', '--once'],
+            cwd=BLOGICUM_DIR, env=env, check=True, capture_output=True,
+        )
+        web.stdin.write('\n')
+        web.stdin.flush()
+        _, in_page, in_feed, new_etag = web.stdout.readline().split()
+    finally:
+        web.communicate(timeout=60)
+
+    assert in_page == 'True', (
+        'После публикации в процессе run_publisher лента сайта должна '
+        'показать пост, а не страницу из кеша.'
+    )
+    assert in_feed == 'True'
+    assert new_etag != etag
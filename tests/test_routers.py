@@ -0,0 +1,113 @@
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog.models import Post
+from core import routers
+from core.middleware import ReplicaRoutingMiddleware
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(
+        routers.ReplicaRouter, 'replicas', lambda self: REPLICAS
+    )
+    return routers.ReplicaRouter()
+
+
+def read_in_request(router, **state):
+    routing = routers.RoutingState()
+    for name, value in state.items():
+        setattr(routing, name, value)
+    token = routers.activate(routing)
+    try:
+        return router.db_for_read(Post)
+    finally:
+        routers.deactivate(token)
+
+
+def test_round_robin(router):
+    chosen = [
+        read_in_request(router, replica_reads=True) for _ in range(4)
+    ]
+    assert chosen == REPLICAS * 2
+
+
+@override_settings(BLOG_REPLICA_SELECTION='least_latency')
+def test_least_latency(router, monkeypatch):
+    monkeypatch.setattr(routers.latency, 'values', {
+        'replica_1': 0.010, 'replica_2': 0.002,
+    })
+    assert read_in_request(router, replica_reads=True) == 'replica_2'
+
+
+def test_reads_outside_requests_use_primary(router):
+    # Команды и обработчики очередей сверяют чтение со своими записями
+    assert router.db_for_read(Post) == 'default'
+
+
+def test_view_hints_and_read_after_write(router):
+    assert read_in_request(router) == 'default'
+    assert read_in_request(router, replica_reads=True) in REPLICAS
+    assert read_in_request(
+        router, replica_reads=True, pinned=True
+    ) == 'default'
+    assert read_in_request(router, replica_reads=True, wrote=True) == (
+        'default'
+    )
+    assert router.db_for_write(Post) == 'default'
+
+
+class ReadOnlyView:
+    replica_reads = True
+
+
+def test_middleware_pins_primary_after_write(router):
+    factory = RequestFactory()
+    seen = {}
+
+    def view(request):
+        seen['read'] = router.db_for_read(Post)
+        if request.method == 'POST':
+            router.db_for_write(Post)
+        return HttpResponse()
+
+    view.view_class = ReadOnlyView
+    middleware = ReplicaRoutingMiddleware(
+        lambda request: middleware.process_view(request, view, (), {})
+        or view(request)
+    )
+
+    response = middleware(factory.get('/'))
+    assert seen['read'] in REPLICAS
+    assert middleware.cookie_name not in response.cookies
+
+    response = middleware(factory.post('/'))
+    cookie = response.cookies[middleware.cookie_name]
+
+    request = factory.get('/')
+    request.COOKIES[middleware.cookie_name] = cookie.value
+    middleware(request)
+    assert seen['read'] == 'default'
+
+
+def test_streamed_body_reads_from_replica(router):
+    seen = []
+
+    def body():
+        seen.append(router.db_for_read(Post))
+        yield b''
+
+    def view(request):
+        return StreamingHttpResponse(body())
+
+    view.view_class = ReadOnlyView
+    middleware = ReplicaRoutingMiddleware(
+        lambda request: middleware.process_view(request, view, (), {})
+        or view(request)
+    )
+
+    b''.join(middleware(RequestFactory().get('/')).streaming_content)
+    assert seen[0] in REPLICAS
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import SearchPaginator
+from blog.search import match_expression, search_posts
+
+
+@pytest.fixture
+def posts(mixer):
+    author = mixer.blend('auth.User')
+    category = mixer.blend('blog.Category', is_published=True)
+
+    def make(title, text='', is_published=True):
+        return mixer.blend(
+            'blog.Post', author=author, category=category, location=None,
+            title=title, text=text, image='', is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+
+    return make
+
+
+def test_match_expression_escapes_operators():
+    assert match_expression('Ёжик OR "туман') == '"ёжик" "or" "туман"*'
+    assert match_expression(' -*() ') is None
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_respects_visibility(posts):
+    title_hit = posts('Туманный ёжик', 'текст')
+    text_hit = posts('Заметка', 'ёжик в тумане')
+    posts('Черновик про ёжика', is_published=False)
+    posts('Другое', 'ничего общего')
+
+    found = list(search_posts(Post.objects, 'ёжик').order_by('search_rank'))
+    assert found == [title_hit, text_hit]
+
+    text_hit.title = 'Прогулка'
+    text_hit.text = 'без совпадений'
+    text_hit.save()
+    assert list(search_posts(Post.objects, 'ёжик')) == [title_hit]
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_SEARCH_WINDOW=3)
+def test_search_pages_by_cursor_within_window(posts):
+    created = [posts(f'Пост {index}', 'общий текст') for index in range(5)]
+    paginator = SearchPaginator(search_posts(Post.objects, 'общий'), 2)
+
+    first = paginator.page()
+    second = paginator.page(after=first.next_cursor)
+    assert not second.has_next()
+    assert {post.pk for post in [*first, *second]} == {
+        post.pk for post in created[2:]
+    }
+    assert list(paginator.page(before=second.previous_cursor)) == list(first)
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_SEARCH_WINDOW=3)
+def test_hidden_posts_do_not_take_window(posts):
+    visible = [posts(f'Пост {index}', 'общий текст') for index in range(3)]
+    for index in range(4):
+        posts(f'Черновик {index}', 'общий текст', is_published=False)
+
+    found = search_posts(Post.objects, 'общий')
+    assert {post.pk for post in found} == {post.pk for post in visible}
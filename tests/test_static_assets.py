@@ -0,0 +1,23 @@
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+
+PURGED_CSS = Path(settings.BASE_DIR) / 'static_dev' / 'css' / (
+    'bootstrap.purged.css'
+)
+
+
+def test_purged_bootstrap_is_fresh(tmp_path):
+    output = tmp_path / 'bootstrap.purged.css'
+    call_command(
+        'purge_bootstrap_css', '--output', str(output), stdout=StringIO()
+    )
+    assert output.read_text(encoding='utf-8') == PURGED_CSS.read_text(
+        encoding='utf-8'
+    ), (
+        'static_dev/css/bootstrap.purged.css устарел: шаблоны используют '
+        'другие классы Bootstrap. Выполните '
+        '`python manage.py purge_bootstrap_css` и закоммитьте результат.'
+    )
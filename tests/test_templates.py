@@ -0,0 +1,52 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Engine, engines
+from django.template.loaders.filesystem import Loader
+
+from core.templates import CACHED_LOADER, precompile, uncached
+
+
+def test_uncached_engine_parses_again(settings):
+    engine = Engine(
+        dirs=[settings.TEMPLATES_DIR],
+        libraries=engines['django'].engine.libraries,
+        loaders=[(
+            CACHED_LOADER, ['django.template.loaders.filesystem.Loader'],
+        )],
+    )
+    cached = engine.get_template('base.html')
+    assert engine.get_template('base.html') is cached
+
+    fresh = uncached(engine)
+    assert fresh.get_template('base.html') is not cached
+    assert engine.get_template('base.html') is cached
+
+
+def test_command_parses_past_cache(settings, monkeypatch):
+    # Как при BLOG_TEMPLATE_PRECOMPILE: кеш заполнен до вызова команды
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'],
+            'loaders': [(CACHED_LOADER, [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ])],
+        },
+    }]
+    precompile()
+    read = []
+    get_contents = Loader.get_contents
+    monkeypatch.setattr(
+        Loader, 'get_contents',
+        lambda self, origin: read.append(origin) or get_contents(self, origin),
+    )
+
+    out = StringIO()
+    call_command('precompile_templates', stdout=out)
+    timed = out.getvalue().splitlines()[:-1]
+    assert timed and len(read) == len(timed), (
+        'Команда должна разбирать шаблоны заново, а не брать их из кеша.'
+    )
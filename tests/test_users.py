@@ -1,5 +1,7 @@
 import inspect
 import os
+import subprocess
+import sys
 from http import HTTPStatus
 from pathlib import Path
 from typing import Tuple, Set, Optional
@@ -236,3 +238,24 @@ def get_extra_urls(
         if x.get("href") not in ignore_urls
     ]
     return diff_urls
+
+
+def test_settings_import_no_apps():
+    # Настройки читаются до загрузки приложений: импорт модулей
+    # приложений из них ломает порядок инициализации Django
+    code = (
+        'import sys, blogicum.settings; '
+        'print(sorted(m for m in sys.modules '
+        "if m.split('.')[0] in ('blog', 'core', 'pages', 'users')))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True,
+        text=True, cwd=Path(settings.BASE_DIR),
+    )
+    assert result.stdout.strip() == '[]'
+
+
+@pytest.mark.django_db
+def test_user_absolute_url(mixer):
+    user = mixer.blend(get_user_model(), username='reader')
+    assert user.get_absolute_url() == '/profile/reader/'